@@ -0,0 +1,275 @@
+import atexit
+import threading
+import time
+import wave
+
+import numpy as np
+
+# PyAudio is only needed for the live microphone; replayed audio
+# (ReplaySource) works without a sound card
+try:
+    import pyaudio
+except ImportError:
+    pyaudio = None
+
+# =========================================
+# CONFIG
+# =========================================
+SAMPLE_RATE = 16000
+CALLBACK_BLOCK = 1024      # frames per PyAudio callback
+RING_SECONDS = 10          # history kept for slow consumers
+
+
+# =========================================
+# Audio Capture Service
+# =========================================
+class AudioCapture:
+    """
+    One long-lived microphone stream feeding a ring buffer of int16 samples.
+
+    The PyAudio callback only copies samples into the ring; consumers
+    (wake detector, command recognizer) pull from a shared read cursor, so
+    the command recognizer continues exactly where the wake detector
+    stopped and the device is never re-opened between turns.
+    """
+
+    def __init__(self, rate=SAMPLE_RATE, ring_seconds=RING_SECONDS,
+                 block=CALLBACK_BLOCK, device_index=None):
+        self.rate = rate
+        self.block = block
+        self.device_index = device_index
+        self.capacity = int(rate * ring_seconds)
+
+        self._ring = np.zeros(self.capacity, dtype=np.int16)
+        self._written = 0      # absolute number of samples written
+        self._cursor = 0       # absolute read position
+        self._mark = 0         # rewind() never goes back past this
+        self._cond = threading.Condition()
+
+        self.dropped = 0       # samples lost because a reader fell behind
+        self._pa = None
+        self._stream = None
+
+    # ---------------------------------
+    # Device
+    # ---------------------------------
+    def start(self):
+        if self._stream is not None:
+            return
+        if pyaudio is None:
+            raise RuntimeError("PyAudio is not installed (no live capture)")
+
+        self._pa = pyaudio.PyAudio()
+        self._stream = self._pa.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=self.rate,
+            input=True,
+            input_device_index=self.device_index,
+            frames_per_buffer=self.block,
+            stream_callback=self._callback
+        )
+        self._stream.start_stream()
+
+    def close(self):
+        if self._stream is not None:
+            try:
+                self._stream.stop_stream()
+                self._stream.close()
+            except Exception:
+                pass
+            self._stream = None
+
+        if self._pa is not None:
+            self._pa.terminate()
+            self._pa = None
+
+        with self._cond:
+            self._cond.notify_all()
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        self.write(np.frombuffer(in_data, dtype=np.int16))
+        return (None, pyaudio.paContinue)
+
+    # ---------------------------------
+    # Ring buffer
+    # ---------------------------------
+    def write(self, samples):
+        """Append int16 samples to the ring (called from the audio thread)."""
+        n = len(samples)
+        if n == 0:
+            return
+
+        with self._cond:
+            if n > self.capacity:
+                self._written += n - self.capacity
+                samples = samples[-self.capacity:]
+                n = self.capacity
+
+            start = self._written % self.capacity
+            first = min(n, self.capacity - start)
+            self._ring[start:start + first] = samples[:first]
+            self._ring[:n - first] = samples[first:]
+
+            self._written += n
+            self._cond.notify_all()
+
+    def _oldest(self):
+        return max(0, self._written - self.capacity)
+
+    def _copy(self, start, n):
+        begin = start % self.capacity
+        first = min(n, self.capacity - begin)
+        if first == n:
+            return self._ring[begin:begin + n].copy()
+        return np.concatenate((self._ring[begin:], self._ring[:n - first]))
+
+    def read(self, frames, timeout=1.0):
+        """
+        Return the next `frames` samples after the cursor as int16 bytes.
+
+        Blocks until they are available; on timeout returns whatever is
+        buffered (possibly b""). With no stream open (closed, or a
+        ReplaySource) nothing more will arrive: the tail is returned at once.
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._written - self._cursor >= frames or self._stream is None,
+                timeout=timeout
+            )
+
+            oldest = self._oldest()
+            if self._cursor < oldest:
+                self.dropped += oldest - self._cursor
+                self._cursor = oldest
+
+            n = min(frames, self._written - self._cursor)
+            data = self._copy(self._cursor, n)
+            self._cursor += n
+
+        return data.tobytes()
+
+    def tell(self):
+        """Absolute sample position of the read cursor."""
+        with self._cond:
+            return self._cursor
+
+    def seek(self, position):
+        """Move the read cursor, clamped to what is still in the ring."""
+        with self._cond:
+            self._cursor = min(max(position, self._oldest()), self._written)
+            return self._cursor
+
+    def mark(self):
+        """Remember the cursor as the oldest sample rewind() may return to."""
+        with self._cond:
+            self._mark = self._cursor
+            return self._mark
+
+    def rewind(self, frames):
+        """Step the cursor back up to frames samples, but not past mark()."""
+        with self._cond:
+            position = max(self._cursor - frames, self._mark, self._oldest())
+            self._cursor = min(position, self._written)
+            return self._cursor
+
+    def skip_to_live(self):
+        """Drop everything buffered so the next read starts with new audio."""
+        with self._cond:
+            self._cursor = self._written
+            return self._cursor
+
+    @property
+    def exhausted(self):
+        """True once the stream is closed and every sample has been read."""
+        with self._cond:
+            return self._stream is None and self._cursor >= self._written
+
+    def clock(self):
+        """Seconds on the consumers' clock (wall time for a live stream)."""
+        return time.time()
+
+
+# =========================================
+# Replay source (WAV files / numpy arrays)
+# =========================================
+class ReplaySource(AudioCapture):
+    """
+    Pre-recorded audio behind the AudioCapture interface.
+
+    Reads never block, so the wake and command recognizers run as fast
+    as they can decode. clock() counts the furthest sample read, so
+    timeouts and endpointing behave as they would on the same audio live;
+    replaying a pre-roll with rewind() doesn't move it back.
+    """
+
+    def __init__(self, samples, rate=SAMPLE_RATE):
+        samples = np.asarray(samples, dtype=np.int16)
+        super().__init__(rate=rate, ring_seconds=len(samples) / rate + 1)
+        self.write(samples)
+        self._consumed = 0     # high-water mark of the read cursor
+
+    @classmethod
+    def from_wav(cls, path, rate=SAMPLE_RATE):
+        """Load a 16-bit WAV, downmixed to mono and resampled to rate."""
+        with wave.open(path, "rb") as wf:
+            if wf.getsampwidth() != 2:
+                raise ValueError(f"{path}: expected 16-bit PCM")
+            channels = wf.getnchannels()
+            source_rate = wf.getframerate()
+            samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1)
+        if source_rate != rate:
+            n = int(len(samples) * rate / source_rate)
+            samples = np.interp(np.arange(n) * source_rate / rate,
+                                np.arange(len(samples)), samples)
+        return cls(samples.astype(np.int16), rate)
+
+    @property
+    def duration(self):
+        return self._written / self.rate
+
+    def start(self):
+        pass
+
+    def read(self, frames, timeout=1.0):
+        data = super().read(frames, timeout)
+        with self._cond:
+            self._consumed = max(self._consumed, self._cursor)
+        return data
+
+    def skip_to_live(self):
+        """Nothing arrives while we are busy: keep the cursor where it is."""
+        return self.tell()
+
+    def clock(self):
+        with self._cond:
+            return self._consumed / self.rate
+
+
+# =========================================
+# Shared instance
+# =========================================
+_capture = None
+_lock = threading.Lock()
+
+
+def set_capture(source):
+    """Install source (e.g. a ReplaySource) as the shared capture."""
+    global _capture
+    with _lock:
+        _capture = source
+        return source
+
+
+def get_capture():
+    """Return the process-wide capture service, starting it on first use."""
+    global _capture
+    with _lock:
+        if _capture is None:
+            _capture = AudioCapture()
+            _capture.start()
+            atexit.register(_capture.close)
+        return _capture
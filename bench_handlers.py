@@ -0,0 +1,36 @@
+import json
+import sys
+import time
+
+from handlers import SLOW, Dispatcher, default_handlers
+from knowledge_base import KnowledgeBase
+
+# =========================================
+# Run every intent handler in isolation and time it
+#   python bench_handlers.py [--slow]   (--slow includes network / DNS)
+# =========================================
+REPEAT = 20
+
+
+def sample_texts(json_path="intent.json"):
+    """First pattern of every intent, as a realistic query"""
+    with open(json_path, "r", encoding="utf-8") as f:
+        return {intent["tag"]: intent["patterns"][0] for intent in json.load(f)["intents"]}
+
+
+if __name__ == "__main__":
+    dispatcher = Dispatcher(default_handlers(KnowledgeBase()))
+    texts = sample_texts()
+
+    print(f"{'intent':<18} {'latency':<8} {'ms/call':>9}  reply")
+    for tag, handler in dispatcher.handlers.items():
+        if handler.latency == SLOW and "--slow" not in sys.argv:
+            continue
+
+        text = texts.get(tag, tag)
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            reply = dispatcher.dispatch(tag, text)
+        ms = (time.perf_counter() - start) / REPEAT * 1000
+
+        print(f"{tag:<18} {handler.latency:<8} {ms:9.3f}  {reply.text[:40]}")
@@ -0,0 +1,113 @@
+import gc
+import os
+import random
+import tempfile
+import time
+
+from kb_store import KBStore, write_store
+from knowledge_base import KBIndex
+
+# =========================================
+# Reference: the old linear dict scan
+# =========================================
+def search_in_dict_scan(query, kb_dict):
+    for key, value in kb_dict.items():
+        if key.lower() == query:
+            return value
+
+    for key, value in kb_dict.items():
+        if query in key.lower() or key.lower() in query:
+            return value
+
+    return None
+
+
+# =========================================
+# Synthetic KB: Devanagari-like keys of 1-3 words
+# =========================================
+CONSONANTS = "कखगघचछजझटठडढतथदधनपफबभमयरलवशसह"
+MATRAS = ["", "ा", "ि", "ी", "ु", "ू", "े", "ै", "ो", "ौ", "ं"]
+
+
+def make_word(rng):
+    return "".join(rng.choice(CONSONANTS) + rng.choice(MATRAS) for _ in range(rng.randint(2, 4)))
+
+
+def make_kb(size, seed=0):
+    rng = random.Random(seed)
+    kb = {}
+    while len(kb) < size:
+        key = " ".join(make_word(rng) for _ in range(rng.randint(1, 3)))
+        kb[key] = f"तथ्य {len(kb)}"
+    return kb
+
+
+def make_queries(kb, count, seed=1):
+    rng = random.Random(seed)
+    keys = list(kb)
+    queries = []
+    for _ in range(count):
+        key = rng.choice(keys)
+        kind = rng.randrange(4)
+        if kind == 0:
+            queries.append(key)                                  # exact
+        elif kind == 1:
+            queries.append(f"{key} के बारे में बताओ")             # key in query
+        elif kind == 2:
+            queries.append(key[:max(3, len(key) // 2)])          # query in key
+        else:
+            queries.append(make_word(rng) + " " + make_word(rng))  # mostly misses
+    return queries
+
+
+def bench(fn, queries):
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries)
+
+
+if __name__ == "__main__":
+    for size in [1_000, 10_000, 100_000]:
+        kb = make_kb(size)
+
+        start = time.perf_counter()
+        index = KBIndex(kb)
+        build = time.perf_counter() - start
+
+        queries = make_queries(kb, 500)
+
+        # Exact hits must agree; every other answer must be a real match
+        for q in queries:
+            got = index.lookup(q)
+            if q in kb:
+                assert got == kb[q], q
+            elif got is not None:
+                assert any(q in k or k in q for k in kb if kb[k] == got), q
+            else:
+                assert search_in_dict_scan(q, kb) is None, q
+
+        # Same answers from the mmap store, opened in O(1)
+        fd, path = tempfile.mkstemp(suffix=".kb")
+        os.close(fd)
+        try:
+            write_store(path, {"bench": kb})
+            gc.collect()
+            start = time.perf_counter()
+            store = KBStore(path)
+            mapped = KBIndex.from_domain(store.domain("bench"))
+            opened = time.perf_counter() - start
+
+            for q in queries:
+                assert mapped.lookup(q) == index.lookup(q), q
+
+            scan = bench(lambda q: search_in_dict_scan(q, kb), queries[:50])
+            indexed = bench(index.lookup, queries)
+            mmapped = bench(mapped.lookup, queries)
+        finally:
+            os.remove(path)
+
+        print(f"{size:>7} entries (index built in {build:.2f} s, store opened in {opened * 1e3:.2f} ms)")
+        print(f"  scan    : {scan * 1e3:9.3f} ms/query")
+        print(f"  indexed : {indexed * 1e3:9.3f} ms/query")
+        print(f"  mmap    : {mmapped * 1e3:9.3f} ms/query")
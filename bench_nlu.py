@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+import time
+
+import nlu
+
+# =========================================
+# Reference: the old O(tokens x keywords) scan
+# =========================================
+def detect_intent_scan(text, intent_map):
+    clean_tokens = nlu.filter_noise(nlu.tokenize(nlu.preprocess(text)))
+
+    for token in clean_tokens:
+        if token in intent_map:
+            return intent_map[token]
+
+    for token in clean_tokens:
+        for keyword, tag in intent_map.items():
+            if nlu.get_levenshtein_distance(token, keyword) <= 1:
+                return tag
+
+    return None
+
+
+# =========================================
+# Build a 10x larger intent file
+# =========================================
+SUFFIXES = ["क", "ख", "ग", "घ", "च", "ज", "ट", "ड", "त"]
+
+def make_large_intents(src="intent.json", factor=10):
+    data = json.load(open(src, encoding="utf-8"))
+    for intent in data["intents"]:
+        extra = []
+        for pattern in intent["patterns"]:
+            for suffix in SUFFIXES[:factor - 1]:
+                extra.append(" ".join(w + suffix + "ा" for w in pattern.split()))
+        intent["patterns"] += extra
+
+    fd, path = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    return path
+
+
+# Queries that miss the exact-match stage and hit (or miss) the fuzzy stage
+QUERIES = [
+    "समाय बताओ", "तारिख", "कुछश दिन", "बेटरी", "सीपीऊ", "रेम उपयोग",
+    "random noise", "asdh din", "टाईम", "डिसक", "वाल्यूम", "कैमर खोलो",
+    "अकबार", "संविधन", "xyz abc", "ब्राउजर",
+]
+
+
+def bench(fn, intent_map, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for q in QUERIES:
+            fn(q, intent_map)
+    return (time.perf_counter() - start) / (rounds * len(QUERIES))
+
+
+if __name__ == "__main__":
+    path = make_large_intents()
+    try:
+        for label, src in [("intent.json", "intent.json"), ("10x intent.json", path)]:
+            intent_map = nlu.load_intents(src)
+
+            # Results must be identical to the old scan
+            for q in QUERIES:
+                expected = detect_intent_scan(q, intent_map)
+                got = nlu.detect_intent(q, intent_map)
+                assert got == expected, f"{q!r}: {got} != {expected}"
+
+            scan = bench(detect_intent_scan, intent_map, rounds=3)
+            indexed = bench(nlu.detect_intent, intent_map, rounds=200)
+            print(f"{label}: {len(intent_map)} keywords")
+            print(f"  scan    : {scan * 1e3:8.3f} ms/query")
+            print(f"  indexed : {indexed * 1e3:8.3f} ms/query")
+            print(f"  speedup : {scan / indexed:8.1f}x")
+    finally:
+        os.remove(path)
@@ -0,0 +1,40 @@
+import subprocess
+import sys
+import time
+
+# =========================================
+# Resident memory: two Models (old) vs one shared Model + recognizers
+# Each mode runs in a fresh process so the numbers don't overlap.
+# =========================================
+MODES = ["separate", "shared"]
+
+
+def run(mode):
+    from vosk import Model, KaldiRecognizer, SetLogLevel
+    import vosk_models
+
+    SetLogLevel(-1)
+    before = vosk_models.rss_mb()
+    start = time.perf_counter()
+
+    if mode == "separate":
+        # What wake_fast.py + wake_vosk.py used to do at import
+        recs = [KaldiRecognizer(Model(vosk_models.MODEL_PATH), 16000) for _ in range(2)]
+    else:
+        recs = [
+            vosk_models.recognizer(),    # wake_fast
+            vosk_models.recognizer(),    # wake_vosk
+        ]
+
+    seconds = time.perf_counter() - start
+    after = vosk_models.rss_mb()
+    print(f"{mode:<9} RSS {before:7.1f} -> {after:7.1f} MB (+{after - before:.1f} MB), "
+          f"load {seconds:.2f} s, {len(recs)} recognizers")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        run(sys.argv[1])
+    else:
+        for mode in MODES:
+            subprocess.run([sys.executable, __file__, mode], check=False)
@@ -0,0 +1,49 @@
+import sys
+import time
+import wave
+
+import numpy as np
+
+import config
+import wake_fast
+
+# =========================================
+# CPU cost of idle wake listening: grammar vs full-vocabulary partials
+#
+#   python bench_wake_cpu.py [idle.wav]
+#
+# Without a WAV (16 kHz mono int16) a minute of low-level noise is used.
+# =========================================
+SECONDS = 60
+
+
+def idle_audio(path=None):
+    if path:
+        with wave.open(path, "rb") as wf:
+            return np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    rng = np.random.default_rng(0)
+    return (rng.normal(0, 40, SECONDS * wake_fast.SAMPLE_RATE)).astype(np.int16)
+
+
+def run(mode, audio):
+    config.WAKE_MODE = mode
+    rec = wake_fast.make_recognizer(mode)
+    block = wake_fast.BLOCK_SIZE
+    wakes = 0
+
+    start = time.process_time()
+    for i in range(0, len(audio) - block + 1, block):
+        fired, _ = wake_fast.detect_wake(rec, audio[i:i + block].tobytes())
+        wakes += fired
+    cpu = time.process_time() - start
+
+    audio_seconds = len(audio) / wake_fast.SAMPLE_RATE
+    per_hour = cpu / audio_seconds * 3600
+    print(f"{mode:<8} {per_hour:8.0f} CPU-s per idle hour "
+          f"({cpu / audio_seconds * 100:5.1f}% of a core), {wakes} false wakes")
+
+
+if __name__ == "__main__":
+    audio = idle_audio(sys.argv[1] if len(sys.argv) > 1 else None)
+    for mode in ["partial", "grammar"]:
+        run(mode, audio)
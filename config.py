@@ -14,8 +14,86 @@ WAKE_WORDS = [
 # Audio Noise Threshold
 # Adjust this based on your microphone. 
 # Typical values: 500-2000 for skipping absolute silence/static.
+# The VAD (vad.py) adapts to the room's noise floor but never requires
+# more than this RMS for a frame to count as speech.
 NOISE_THRESHOLD = 800
 
+# Voice activity gate in front of the recognizers: silent blocks are not
+# decoded. VAD_MIN_RMS is the lowest threshold the adaptive floor can
+# reach; VAD_USE_ZCR also rejects loud high zero-crossing noise (hiss).
+VAD_ENABLED = True
+VAD_MIN_RMS = 30
+VAD_USE_ZCR = False
+
+# Pre-roll (seconds of audio before the wake hit) replayed into the
+# command recognizer, so "नीवा समय बताओ" works in one breath.
+# ONE_BREATH_GRACE: how long to wait for such a command before falling
+# back to the spoken acknowledgement ("हाँ बताइए").
+PREROLL_SECONDS = 1.5
+ONE_BREATH_GRACE = 1.2
+
+# Wake word spotting:
+#   "grammar" - recognizer restricted to WAKE_WORDS + [unk] (cheap, precise)
+#   "partial" - full-vocabulary partial decoding with substring checks (old)
+# WAKE_CONFIDENCE: minimum word confidence for a final grammar result.
+# WAKE_STABLE_PARTIALS: consecutive partials that must contain the wake
+# word before it fires without waiting for the final result.
+WAKE_MODE = "grammar"
+WAKE_CONFIDENCE = 0.6
+WAKE_STABLE_PARTIALS = 2
+
+# ML intent predictions below this probability are ignored (the query
+# goes on to RAG / the LLM). 0.5 keeps held-out precision of the char
+# model near 99% with no off-script question passing (eval_intent.py --sweep)
+INTENT_CONFIDENCE = 0.5
+
+# Command endpointing: stop listening once this much silence follows
+# speech (seconds), plus ENDPOINT_EXTEND per second already spoken, up
+# to ENDPOINT_MAX_SILENCE. The listen_loop timeout stays a hard limit.
+ENDPOINT_SILENCE = 0.5
+ENDPOINT_EXTEND = 0.1
+ENDPOINT_MAX_SILENCE = 1.0
+
+# TTS playback: True streams Piper audio in-process via sounddevice as
+# each sentence is synthesized; False uses a temp WAV + aplay/PowerShell.
+TTS_STREAMING = True
+
+# Phrase-level TTS cache (raw PCM files, LRU bounded)
+TTS_CACHE_DIR = "tts_cache"
+TTS_CACHE_MAX_MB = 64
+
+# Knowledge base hot reload: seconds between checks of knowledge_base.kb,
+# the *_kb.json sources and rag.jsonl (0 disables)
+KB_WATCH_INTERVAL = 2.0
+
+# LLM fallback: speak each clause while the rest is still generating
+LLM_STREAMING = True
+
+# KV state of the LLM system prompt, saved so restarts skip evaluating it
+# (None keeps it in memory only)
+LLM_PREFIX_STATE = "llm_prefix.state"
+
+# Cache of LLM fallback answers (JSON on disk, LRU + TTL, near-duplicate
+# matching on TF-IDF cosine similarity between cached queries)
+RESPONSE_CACHE_PATH = "response_cache.json"
+RESPONSE_CACHE_SIZE = 256
+RESPONSE_CACHE_TTL = 7 * 24 * 3600      # seconds
+RESPONSE_CACHE_SIMILARITY = 0.9
+
+# Main loop: False = sequential (wake -> command -> reply -> wake);
+# True = asyncio runtime (runtime.py) that keeps spotting the wake word
+# while replying, so a new wake word interrupts the current answer.
+# Barge-in needs the speaker's echo kept out of the mic (headset / AEC),
+# otherwise the assistant can wake itself.
+ASYNC_RUNTIME = False
+
+# Per-turn latency tracing (tracing.py): one JSON line per turn with the
+# duration of every stage; a p50/p95 summary is printed every
+# TRACE_SUMMARY_EVERY turns (0 disables it)
+TRACE_ENABLED = True
+TRACE_PATH = "turns.jsonl"
+TRACE_SUMMARY_EVERY = 20
+
 # Messages
 MSG_CAMERA_NOT_FOUND = "कौई कैमरा नहीं मिला"  # No camera found
 MSG_CAMERA_OPENING = "कैमरा खोल रहा हूँ"      # Opening camera
@@ -0,0 +1,20 @@
+# =========================================
+# Convert KB sources to the mmap store
+# =========================================
+from kb_store import write_store
+from knowledge_base import KB_PATH, KB_SOURCES, load_source
+
+
+def convert(sources=KB_SOURCES, out_path=KB_PATH):
+    # rag.jsonl is served (and hot-reloaded) by rag.SimpleRAG, not the store
+    domains = {}
+    for name, filename in sources.items():
+        domains[name] = load_source(filename)
+        print(f"✅ {name}: {len(domains[name])} entries")
+
+    write_store(out_path, domains)
+    print(f"\n✅ Knowledge base written to {out_path}")
+
+
+if __name__ == "__main__":
+    convert()
@@ -1,9 +1,10 @@
 # =========================================
-# Create Knowledge Base PKL Files
+# Create Knowledge Base JSON Files
 # =========================================
-import pickle
 import json
 
+from convert_kb import convert
+
 # =========================================
 # HISTORY KNOWLEDGE BASE
 # =========================================
@@ -23,8 +24,8 @@ history_kb = {
     "झांसी की रानी": "भारतीय स्वतंत्रता संग्राम की महान वीरांगना",
 }
 
-with open("history_kb.pkl", "wb") as f:
-    pickle.dump(history_kb, f)
+with open("history_kb.json", "w", encoding="utf-8") as f:
+    json.dump(history_kb, f, ensure_ascii=False, indent=2)
 print("✅ History KB created")
 
 # =========================================
@@ -48,8 +49,8 @@ indian_history_kb = {
     "कोणार्क": "ओडिशा में स्थित सूर्य मंदिर",
 }
 
-with open("indian_history_kb.pkl", "wb") as f:
-    pickle.dump(indian_history_kb, f)
+with open("indian_history_kb.json", "w", encoding="utf-8") as f:
+    json.dump(indian_history_kb, f, ensure_ascii=False, indent=2)
 print("✅ Indian History KB created")
 
 # =========================================
@@ -72,8 +73,8 @@ politics_kb = {
     "मंत्रिपरिषद": "मंत्रियों का समूह जो प्रधान मंत्री के अंतर्गत काम करता है",
 }
 
-with open("politics_kb.pkl", "wb") as f:
-    pickle.dump(politics_kb, f)
+with open("politics_kb.json", "w", encoding="utf-8") as f:
+    json.dump(politics_kb, f, ensure_ascii=False, indent=2)
 print("✅ Politics KB created")
 
 # =========================================
@@ -97,8 +98,8 @@ world_gk_kb = {
     "रूस": "विश्व का सबसे बड़ा देश",
 }
 
-with open("world_gk_kb.pkl", "wb") as f:
-    pickle.dump(world_gk_kb, f)
+with open("world_gk_kb.json", "w", encoding="utf-8") as f:
+    json.dump(world_gk_kb, f, ensure_ascii=False, indent=2)
 print("✅ World General Knowledge KB created")
 
 # =========================================
@@ -124,8 +125,11 @@ india_gk_kb = {
     "गणतंत्र दिवस": "26 जनवरी को भारत का संविधान लागू हुआ",
 }
 
-with open("india_gk_kb.pkl", "wb") as f:
-    pickle.dump(india_gk_kb, f)
+with open("india_gk_kb.json", "w", encoding="utf-8") as f:
+    json.dump(india_gk_kb, f, ensure_ascii=False, indent=2)
 print("✅ India General Knowledge KB created")
 
 print("\n✅ All Knowledge Base files created successfully!")
+
+# Rebuild the mmap store that KnowledgeBase actually reads
+convert()
@@ -0,0 +1,214 @@
+import random
+import sys
+
+import numpy as np
+from sklearn.model_selection import StratifiedKFold
+
+import config
+import nlu
+from intent_model import build_pipeline, load_patterns
+
+# =========================================
+# Intent accuracy under ASR-style spelling noise
+#
+#   python eval_intent.py [variants_per_pattern] [--sweep]
+#
+# Every intent.json pattern is perturbed the way Vosk tends to misspell
+# Hindi, then classified by the word and char n-gram models.
+#   train    : the models' own patterns (clean + noisy), optimistic
+#   held-out : k-fold over the patterns, so the model hasn't seen them
+#   off-script questions that should reach RAG / the LLM
+# "fallback" = neither the deterministic NLU nor a confident ML
+# prediction; "overridden" = the NLU answered wrong where the ML label
+# was right. --sweep tries C x gate for the char model.
+# =========================================
+SEED = 0
+FOLDS = 3     # the smallest intents have 3 patterns
+
+# Not intents: these should fall through to RAG / the LLM
+OFF_SCRIPT = [
+    "सूरज पूर्व से क्यों उगता है", "मुझे एक कहानी सुनाओ", "पानी का रासायनिक सूत्र क्या है",
+    "क्रिकेट विश्व कप किसने जीता", "आज मौसम कैसा है", "एक चुटकुला सुनाओ",
+    "दो और दो कितने होते हैं", "गुलाब जामुन कैसे बनाते हैं", "सबसे ऊँचा पहाड़ कौन सा है",
+    "चाँद पर पहला आदमी कौन गया", "what is the capital of france", "tell me a joke",
+    "योग के फायदे बताओ", "मेरा दोस्त कहाँ है", "कंप्यूटर कैसे काम करता है",
+    "बारिश क्यों होती है", "गाना चलाओ", "सुबह सात बजे अलार्म लगाओ",
+    "किताब पढ़ने के फायदे", "मुझे भूख लगी है",
+]
+
+# Matras Vosk confuses with each other
+MATRA_SWAPS = {
+    "ि": "ी", "ी": "ि", "ु": "ू", "ू": "ु",
+    "े": "ै", "ै": "े", "ो": "ौ", "ौ": "ो",
+    "ं": "ँ", "ँ": "ं", "ा": "",
+}
+NUKTA = "़"
+FILLERS = ["जी", "ना", "अच्छा", "बस"]
+
+
+def swap_matra(text, rng):
+    spots = [i for i, c in enumerate(text) if c in MATRA_SWAPS]
+    if not spots:
+        return text
+    i = rng.choice(spots)
+    return text[:i] + MATRA_SWAPS[text[i]] + text[i + 1:]
+
+
+def drop_matra(text, rng):
+    spots = [i for i, c in enumerate(text) if c in MATRA_SWAPS]
+    if not spots:
+        return text
+    i = rng.choice(spots)
+    return text[:i] + text[i + 1:]
+
+
+def add_nukta(text, rng):
+    spots = [i for i, c in enumerate(text) if c in "जफडढकखग"]
+    if not spots:
+        return text
+    i = rng.choice(spots)
+    return text[:i + 1] + NUKTA + text[i + 1:]
+
+
+def merge_words(text, rng):
+    words = text.split()
+    if len(words) < 2:
+        return text
+    i = rng.randrange(len(words) - 1)
+    return " ".join(words[:i] + [words[i] + words[i + 1]] + words[i + 2:])
+
+
+def add_filler(text, rng):
+    words = text.split()
+    words.insert(rng.randrange(len(words) + 1), rng.choice(FILLERS))
+    return " ".join(words)
+
+
+PERTURBATIONS = [swap_matra, drop_matra, add_nukta, merge_words, add_filler]
+
+
+def perturb(text, rng, edits=1):
+    for _ in range(edits):
+        text = rng.choice(PERTURBATIONS)(text, rng)
+    return text
+
+
+def make_noisy(X, y, variants, seed=SEED):
+    rng = random.Random(seed)
+    noisy_X, noisy_y = [], []
+    for text, tag in zip(X, y):
+        for _ in range(variants):
+            noisy_X.append(perturb(text, rng, edits=rng.choice([1, 1, 2])))
+            noisy_y.append(tag)
+    return noisy_X, noisy_y
+
+
+def predictions(pipeline, X):
+    """(ML label, confidence) arrays"""
+    probs = pipeline.predict_proba(X)
+    return pipeline.classes_[probs.argmax(axis=1)], probs.max(axis=1)
+
+
+def evaluate(labels, conf, X, y, intent_map, gate=config.INTENT_CONFIDENCE):
+    """
+    Same order as main.resolve_intent: deterministic keywords, then the
+    ML label if its confidence clears the gate.
+    """
+    tags = np.array(y)
+    confident = conf > gate
+    ml_right = labels == tags
+
+    correct = fallback = overridden = 0
+    for text, tag, label, ok, right in zip(X, y, labels, confident, ml_right):
+        keyword = nlu.detect_intent(text, intent_map)
+        intent = keyword or (label if ok else None)
+        if intent is None:
+            fallback += 1
+        elif intent == tag:
+            correct += 1
+        if keyword is not None and keyword != tag and right:
+            overridden += 1
+
+    n = len(X)
+    return {
+        "ml_accuracy": float(np.mean(ml_right)),
+        "ml_confident": float(np.mean(confident)),
+        # Precision of the predictions that pass the gate
+        "ml_precision": float(np.mean(ml_right[confident])) if confident.any() else 0.0,
+        "accuracy": correct / n,
+        "fallback": fallback / n,
+        "wrong": (n - correct - fallback) / n,
+        "overridden": overridden / n,
+    }
+
+
+def held_out(features, X, y, variants, C=None, folds=FOLDS):
+    """
+    Predictions for every pattern (and its noisy variants) from a model
+    trained on the other folds.
+    """
+    X, y = np.array(X, dtype=object), np.array(y)
+    texts, tags, labels, conf = [], [], [], []
+    for train, test in StratifiedKFold(folds, shuffle=True, random_state=SEED).split(X, y):
+        kwargs = {"C": C} if C is not None else {}
+        pipeline = build_pipeline(features, **kwargs).fit(list(X[train]), list(y[train]))
+        noisy_X, noisy_y = make_noisy(list(X[test]), list(y[test]), variants)
+        fold_X, fold_y = list(X[test]) + noisy_X, list(y[test]) + noisy_y
+        fold_labels, fold_conf = predictions(pipeline, fold_X)
+        texts += fold_X
+        tags += fold_y
+        labels += list(fold_labels)
+        conf += list(fold_conf)
+    return texts, tags, np.array(labels), np.array(conf)
+
+
+def off_script(pipeline, intent_map, gate=config.INTENT_CONFIDENCE):
+    """Share of OFF_SCRIPT questions the ML model / the NLU would claim"""
+    labels, conf = predictions(pipeline, OFF_SCRIPT)
+    keywords = [nlu.detect_intent(text, intent_map) for text in OFF_SCRIPT]
+    return float(np.mean(conf > gate)), float(np.mean([k is not None for k in keywords]))
+
+
+def sweep(X, y, variants, intent_map):
+    print(f"\nchar model, held-out patterns + noisy variants")
+    print(f"{'C':>5} {'gate':>5} {'ML conf':>8} {'ML prec':>8} {'acc':>7} {'fallback':>9} {'off-script':>11}")
+    for C in [3, 10, 30, 100]:
+        texts, tags, labels, conf = held_out("char", X, y, variants, C=C)
+        pipeline = build_pipeline("char", C=C).fit(X, y)
+        for gate in [0.3, 0.4, 0.5, 0.65]:
+            r = evaluate(labels, conf, texts, tags, intent_map, gate)
+            accepted, _ = off_script(pipeline, intent_map, gate)
+            print(f"{C:>5} {gate:>5} {r['ml_confident']:8.1%} {r['ml_precision']:8.1%} "
+                  f"{r['accuracy']:7.1%} {r['fallback']:9.1%} {accepted:11.1%}")
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    variants = int(args[0]) if args else 5
+    X, y = load_patterns()
+    noisy_X, noisy_y = make_noisy(X, y, variants)
+    intent_map = nlu.load_intents("intent.json")
+
+    print(f"{len(X)} patterns, {len(noisy_X)} noisy variants, "
+          f"confidence gate {config.INTENT_CONFIDENCE}")
+    print(f"{'model':<6} {'set':<9} {'ML acc':>7} {'ML conf':>8} {'ML prec':>8} "
+          f"{'acc':>7} {'fallback':>9} {'wrong':>7} {'overridden':>11}")
+    for features in ["word", "char"]:
+        pipeline = build_pipeline(features).fit(X, y)
+        sets = [
+            ("clean", (X, y, *predictions(pipeline, X))),
+            ("noisy", (noisy_X, noisy_y, *predictions(pipeline, noisy_X))),
+            ("held-out", held_out(features, X, y, variants)),
+        ]
+        for name, (texts, tags, labels, conf) in sets:
+            r = evaluate(labels, conf, texts, tags, intent_map)
+            print(f"{features:<6} {name:<9} {r['ml_accuracy']:7.1%} {r['ml_confident']:8.1%} "
+                  f"{r['ml_precision']:8.1%} {r['accuracy']:7.1%} {r['fallback']:9.1%} "
+                  f"{r['wrong']:7.1%} {r['overridden']:11.1%}")
+
+        accepted, claimed = off_script(pipeline, intent_map)
+        print(f"{features:<6} off-script: {accepted:.0%} pass the ML gate, "
+              f"{claimed:.0%} matched by the NLU keywords")
+
+    if "--sweep" in sys.argv:
+        sweep(X, y, variants, intent_map)
@@ -0,0 +1,113 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import config
+import wake_fast
+import wake_vosk
+from audio_capture import ReplaySource, set_capture
+
+# =========================================
+# Batch evaluation of the wake + command paths on recorded audio
+#
+#   python eval_wake.py <corpus_dir> [-v]
+#
+# <corpus_dir>/labels.jsonl, one utterance per line:
+#   {"audio": "clip01.wav", "wake": true, "text": "समय बताओ"}
+#   {"audio": "tv_noise.wav", "wake": false}
+# "text" (optional) is the command expected after the wake word.
+# No microphone needed: audio is replayed faster than real time.
+# =========================================
+COMMAND_TIMEOUT = 4.5
+
+
+def load_corpus(directory):
+    items = []
+    with open(os.path.join(directory, "labels.jsonl"), "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                item["path"] = os.path.join(directory, item["audio"])
+                items.append(item)
+    return items
+
+
+def run_item(source, expect_text=False):
+    """Wake (+ command) on one replayed clip; returns (woke, command text)"""
+    set_capture(source)
+    wake_fast.rec.Reset()
+    wake_fast.vad.reset()
+    wake_fast.onset.drain()
+
+    woke = wake_fast.listen_for_wake()
+    command = None
+    if woke and expect_text:
+        # Same call main.py makes for "नीवा समय बताओ" in one breath
+        result = wake_vosk.listen_loop(
+            timeout=COMMAND_TIMEOUT,
+            resume=True,
+            preroll=config.PREROLL_SECONDS,
+            speech_grace=config.ONE_BREATH_GRACE,
+        )
+        command = result["text"] if result else None
+    return woke, command
+
+
+def evaluate(items, verbose=False):
+    wake_fast.load_model()
+    wake_vosk.load_model()
+    if not wake_fast.rec or not wake_vosk.rec:
+        raise SystemExit("❌ Vosk model not available")
+
+    rows = []
+    for item in items:
+        source = ReplaySource.from_wav(item["path"])
+        start = time.perf_counter()
+        out = io.StringIO()
+        with contextlib.redirect_stdout(sys.stdout if verbose else out):
+            woke, command = run_item(source, "text" in item)
+        decode = time.perf_counter() - start
+
+        rows.append(dict(item, woke=woke, command=command,
+                         duration=source.duration, decode=decode))
+        mark = "✅" if woke == item["wake"] else "❌"
+        print(f"{mark} {item['audio']:<30} wake={woke!s:<5} {decode * 1000:7.0f} ms "
+              f"RTF {decode / source.duration:.3f}  {command or ''}")
+
+    return rows
+
+
+def report(rows):
+    positives = [r for r in rows if r["wake"]]
+    negatives = [r for r in rows if not r["wake"]]
+    commands = [r for r in positives if "text" in r]
+    decode = np.array([r["decode"] for r in rows])
+    negative_hours = sum(r["duration"] for r in negatives) / 3600
+
+    print()
+    if positives:
+        print(f"Wake hit rate      : {sum(r['woke'] for r in positives) / len(positives):6.1%} "
+              f"({len(positives)} clips)")
+    if negatives:
+        false_accepts = sum(r["woke"] for r in negatives)
+        print(f"False accept rate  : {false_accepts / len(negatives):6.1%} "
+              f"({false_accepts / negative_hours:.1f} per hour of negative audio)")
+    if commands:
+        exact = sum(r["command"] == r["text"] for r in commands)
+        print(f"Command exact match: {exact / len(commands):6.1%} ({len(commands)} clips)")
+    if rows:
+        print(f"Decode per clip    : p50 {np.percentile(decode, 50) * 1000:.0f} ms, "
+              f"p95 {np.percentile(decode, 95) * 1000:.0f} ms")
+        print(f"Real-time factor   : {decode.sum() / sum(r['duration'] for r in rows):.3f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python eval_wake.py <corpus_dir> [-v]")
+        raise SystemExit(1)
+    report(evaluate(load_corpus(sys.argv[1]), verbose="-v" in sys.argv))
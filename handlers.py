@@ -0,0 +1,221 @@
+# =========================================
+# Intent handlers + dispatcher
+# =========================================
+import json
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import system_info as sys
+
+# Latency classes
+INSTANT = "instant"   # constant reply, nothing to compute
+FAST = "fast"         # local lookup (psutil, knowledge base), a few ms
+SLOW = "slow"         # may block on the network / disk; runs in the worker pool
+
+# TTS caching policy of a handler's replies
+CACHE_NONE = "none"           # arbitrary text, synthesized every time
+CACHE_PHRASE = "phrase"       # fixed phrases, prewarmed in the TTS cache
+CACHE_TEMPLATE = "template"   # fixed text around a {value} slot
+
+# Spoken by main.py / runtime.py when RAG and the LLM have nothing either
+NO_ANSWER = "मुझे इस बारे में पूरी जानकारी नहीं है"
+
+
+class Reply:
+    """What a handler wants spoken (and whether the assistant should stop)"""
+
+    def __init__(self, text, template=None, slots=None, stop=False):
+        self.text = text
+        self.template = template    # speak_template(template, **slots)
+        self.slots = slots or {}
+        self.stop = stop            # leave the main loop after speaking
+
+
+class Handler(ABC):
+    """
+    Base class for one intent's behaviour.
+
+    latency:      INSTANT / FAST / SLOW (SLOW handlers run in the pool)
+    cache:        TTS caching policy of the replies (CACHE_*)
+    asynchronous: safe to run off the main thread
+    """
+
+    latency = FAST
+    cache = CACHE_NONE
+    asynchronous = True
+
+    @abstractmethod
+    def handle(self, text):
+        """Reply for one utterance"""
+
+    def phrases(self):
+        """Fixed texts to prewarm in the TTS cache"""
+        return []
+
+
+class StaticHandler(Handler):
+    latency = INSTANT
+    cache = CACHE_PHRASE
+
+    def __init__(self, response, stop=False):
+        self.response = response
+        self.stop = stop
+
+    def handle(self, text):
+        return Reply(self.response, stop=self.stop)
+
+    def phrases(self):
+        return [self.response]
+
+
+class TemplateHandler(Handler):
+    """Fixed sentence around one live value, e.g. "अभी समय है {value}" """
+
+    cache = CACHE_TEMPLATE
+
+    def __init__(self, template, get_value, latency=FAST):
+        self.template = template
+        self.get_value = get_value
+        self.latency = latency
+
+    def handle(self, text):
+        slots = {"value": self.get_value()}
+        return Reply(self.template.format(**slots), self.template, slots)
+
+
+class CallHandler(Handler):
+    """Reply is whatever fn() returns; known outputs can be prewarmed"""
+
+    def __init__(self, fn, latency=FAST, outputs=()):
+        self.fn = fn
+        self.latency = latency
+        self.outputs = list(outputs)
+        if self.outputs:
+            self.cache = CACHE_PHRASE
+
+    def handle(self, text):
+        return Reply(self.fn())
+
+    def phrases(self):
+        return self.outputs
+
+
+class KBHandler(Handler):
+    """Answer from one knowledge-base domain"""
+
+    def __init__(self, lookup):
+        self.lookup = lookup
+
+    def handle(self, text):
+        # A miss is an empty reply: the caller falls through to RAG / the LLM
+        return Reply(self.lookup(text) or "")
+
+
+# =========================================
+# Dispatcher
+# =========================================
+class Dispatcher:
+    """
+    intent tag -> Handler registry.
+
+    INSTANT/FAST handlers run inline; SLOW asynchronous ones go to a small
+    thread pool, so submit() never blocks the caller on them.
+    """
+
+    def __init__(self, handlers=None, workers=2):
+        self.handlers = dict(handlers or {})
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="handler")
+
+    def register(self, tag, handler):
+        self.handlers[tag] = handler
+
+    def __contains__(self, tag):
+        return tag in self.handlers
+
+    def get(self, tag):
+        return self.handlers.get(tag)
+
+    def submit(self, tag, text):
+        """Future of the Reply for tag (None if nothing is registered)"""
+        handler = self.handlers.get(tag)
+        if handler is None:
+            return None
+
+        if handler.latency == SLOW and handler.asynchronous:
+            return self._pool.submit(handler.handle, text)
+
+        future = Future()
+        try:
+            future.set_result(handler.handle(text))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def dispatch(self, tag, text):
+        """Reply for tag, or None if the intent has no handler"""
+        future = self.submit(tag, text)
+        return future.result() if future else None
+
+    def phrases(self):
+        """Every fixed phrase the handlers can speak (for TTS prewarm)"""
+        seen = []
+        for handler in self.handlers.values():
+            seen += [p for p in handler.phrases() if p not in seen]
+        return seen
+
+    def templates(self):
+        return [h.template for h in self.handlers.values() if h.cache == CACHE_TEMPLATE]
+
+    def missing(self, json_path):
+        """Tags in intent.json that have no handler"""
+        with open(json_path, "r", encoding="utf-8") as f:
+            tags = [intent["tag"] for intent in json.load(f)["intents"]]
+        return [tag for tag in tags if tag not in self.handlers]
+
+
+# =========================================
+# The assistant's intents
+# =========================================
+def default_handlers(kb):
+    return {
+        # System info: fixed text is cached, only {value} is synthesized
+        "time": TemplateHandler("अभी समय है {value}", sys.time_now),
+        "date": TemplateHandler("आज की तारीख है {value}", sys.date_today),
+        "day": TemplateHandler("आज {value} है", sys.day_today),
+        "uptime": TemplateHandler("सिस्टम {value} से चालू है", sys.uptime),
+        "cpu": TemplateHandler("सीपीयू उपयोग {value} है", sys.cpu),
+        "ram": TemplateHandler("रैम उपयोग {value} है", sys.ram),
+        "disk": TemplateHandler("डिस्क उपयोग {value} है", sys.disk),
+        "battery": TemplateHandler("बैटरी {value}", sys.battery),
+        "temperature": TemplateHandler("तापमान {value}", sys.temp),
+        "ip": TemplateHandler("आईपी एड्रेस है {value}", sys.ip, latency=SLOW),   # DNS lookup
+        "hostname": TemplateHandler("कंप्यूटर का नाम है {value}", sys.hostname),
+        "network": CallHandler(sys.network, latency=SLOW,                       # 2 s connect timeout
+                               outputs=["इंटरनेट चालू है", "इंटरनेट बंद है"]),
+
+        # Device actions (commands still to be wired up)
+        "volume_up": StaticHandler("वॉल्यूम बढ़ा रहा हूँ"),
+        "volume_down": StaticHandler("वॉल्यूम कम कर रहा हूँ"),
+        "mute": StaticHandler("म्यूट कर रहा हूँ"),
+        "brightness_up": StaticHandler("स्क्रीन की चमक बढ़ा रहा हूँ"),
+        "brightness_down": StaticHandler("स्क्रीन की चमक कम कर रहा हूँ"),
+        "open_camera": StaticHandler("कैमरा खोल रहा हूँ"),
+        "take_photo": StaticHandler("फोटो ले रहा हूँ"),
+        "record_video": StaticHandler("वीडियो रिकॉर्ड कर रहा हूँ"),
+        "record_audio": StaticHandler("ऑडियो रिकॉर्ड कर रहा हूँ"),
+        "open_browser": StaticHandler("ब्राउज़र खोल रहा हूँ"),
+        "shutdown": StaticHandler("सिस्टम बंद कर रहा हूँ", stop=True),
+        "restart": StaticHandler("सिस्टम रीस्टार्ट कर रहा हूँ", stop=True),
+        "exit": StaticHandler("अलविदा", stop=True),
+
+        # Assistant
+        "assistant_name": StaticHandler("मेरा नाम नोवा है"),
+        "assistant_status": StaticHandler("मैं तैयार हूँ"),
+
+        # Knowledge base domains
+        "history": KBHandler(kb.get_history),
+        "indian_history": KBHandler(kb.get_indian_history),
+        "politics": KBHandler(kb.get_politics),
+        "world_gk": KBHandler(kb.get_world_gk),
+        "india_gk": KBHandler(kb.get_india_gk),
+    }
@@ -0,0 +1,65 @@
+# =========================================
+# Intent classifier (TF-IDF + logistic regression)
+# =========================================
+import pickle
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+MODEL_PATH = "intent_pipeline.pkl"
+
+
+class IntentModel(ABC):
+    """
+    Predictions shared by every intent model; a subclass provides
+    proba() and the `classes` array its columns refer to.
+    """
+
+    classes = None
+
+    @abstractmethod
+    def proba(self, texts):
+        """(len(texts), n_classes) probabilities"""
+
+    def predict(self, text):
+        """(intent, confidence) of one utterance"""
+        return self.predict_batch([text])[0]
+
+    def predict_batch(self, texts):
+        """[(intent, confidence), ...] for many utterances in one pass"""
+        probs = self.proba(texts)
+        best = probs.argmax(axis=1)
+        return [(str(self.classes[i]), float(p[i])) for i, p in zip(best, probs)]
+
+    def top_k(self, text, k=3):
+        """The k most likely intents with their probabilities"""
+        probs = self.proba([text])[0]
+        order = np.argsort(probs)[::-1][:k]
+        return [(str(self.classes[i]), float(probs[i])) for i in order]
+
+
+class IntentClassifier(IntentModel):
+    """
+    One sklearn Pipeline (vectorizer + classifier) loaded once.
+
+    Every prediction is a single predict_proba pass; the label is the
+    argmax of those probabilities instead of a second predict() call.
+    """
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.classes = np.asarray(pipeline.classes_)
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        with open(path, "rb") as f:
+            return cls(pickle.load(f))
+
+    @property
+    def vectorizer(self):
+        """The fitted TF-IDF step"""
+        return self.pipeline.steps[0][1]
+
+    def proba(self, texts):
+        """(len(texts), n_classes) probabilities"""
+        return self.pipeline.predict_proba(list(texts))
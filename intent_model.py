@@ -1,23 +1,81 @@
-import json, pickle
+import json, pickle, sys
+import numpy as np
+from sklearn.calibration import CalibratedClassifierCV
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
 
-data = json.load(open("intent.json", encoding="utf-8"))
+import nlu
+from intent_classifier import MODEL_PATH
+from intent_scorer import NPZ_PATH, IntentScorer, export_npz
 
-X, y = [], []
-for intent in data["intents"]:
-    for p in intent["patterns"]:
-        X.append(p)
-        y.append(intent["tag"])
+# python intent_model.py [--word] [--calibrate]
+# Default features are character n-grams (char_wb, 2-4) over
+# Devanagari-normalized text, so an ASR slip in one matra still shares
+# most n-grams with the pattern. --word trains the old word-token model.
+# --calibrate: sigmoid-calibrate the probabilities with 3-fold CV
+# (needs at least 3 patterns per intent)
+CALIBRATION_FOLDS = 3
+CHAR_NGRAMS = (2, 4)
+# Picked with eval_intent.py --sweep: higher C makes more held-out
+# predictions clear config.INTENT_CONFIDENCE, but more of them are wrong
+# and off-script questions start to pass the gate
+CHAR_C = 10
 
-vectorizer = TfidfVectorizer()
-Xv = vectorizer.fit_transform(X)
 
-model = LogisticRegression()
-model.fit(Xv, y)
+def load_patterns(json_path="intent.json"):
+    data = json.load(open(json_path, encoding="utf-8"))
 
-pickle.dump(model, open("intent_model.pkl", "wb"))
-pickle.dump(vectorizer, open("vectorizer.pkl", "wb"))
+    X, y = [], []
+    for intent in data["intents"]:
+        for p in intent["patterns"]:
+            X.append(p)
+            y.append(intent["tag"])
+    return X, y
 
-print("✅ Intent model trained")
 
+def build_pipeline(features="char", calibrate=False, C=CHAR_C):
+    if features == "char":
+        vectorizer = TfidfVectorizer(
+            analyzer="char_wb",
+            ngram_range=CHAR_NGRAMS,
+            preprocessor=nlu.normalize_devanagari,
+            sublinear_tf=True,
+        )
+        # Many more (overlapping) features than words: weaker regularization
+        # keeps the probabilities from flattening out
+        classifier = LogisticRegression(C=C, max_iter=1000)
+    else:
+        vectorizer = TfidfVectorizer()
+        classifier = LogisticRegression()
+
+    if calibrate:
+        classifier = CalibratedClassifierCV(classifier, method="sigmoid", cv=CALIBRATION_FOLDS)
+
+    # Vectorizer + classifier in one artifact, loaded by intent_classifier.py
+    return Pipeline([
+        ("tfidf", vectorizer),
+        ("clf", classifier),
+    ])
+
+
+if __name__ == "__main__":
+    X, y = load_patterns()
+    features = "word" if "--word" in sys.argv else "char"
+
+    pipeline = build_pipeline(features, calibrate="--calibrate" in sys.argv)
+    pipeline.fit(X, y)
+
+    pickle.dump(pipeline, open(MODEL_PATH, "wb"))
+
+    # Plain arrays for the runtime scorer (main.py doesn't import sklearn)
+    try:
+        export_npz(pipeline, NPZ_PATH)
+        # The scorer must reproduce predict_proba, not just the labels
+        drift = np.abs(IntentScorer.load(NPZ_PATH).proba(X) - pipeline.predict_proba(X)).max()
+        assert drift < 1e-9, f"exported scorer drifts by {drift}"
+        print(f"✅ Exported {NPZ_PATH} (max probability difference {drift:.1e})")
+    except ValueError as e:
+        print(f"⚠️ {NPZ_PATH} not exported: {e}")
+
+    print(f"✅ Intent model trained ({MODEL_PATH}, {features} features)")
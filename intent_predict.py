@@ -1,10 +1,9 @@
-import pickle
-import numpy as np
 
-# Load trained model and vectorizer
+from intent_classifier import IntentClassifier
+
+# Load trained pipeline (see intent_model.py)
 try:
-    model = pickle.load(open("intent_model.pkl", "rb"))
-    vectorizer = pickle.load(open("vectorizer.pkl", "rb"))
+    classifier = IntentClassifier.load()
     MODEL_LOADED = True
 except Exception as e:
     print(f"Warning: Intent model not found: {e}")
@@ -15,15 +14,8 @@ def get_intent(text):
         return None, 0.0
         
     try:
-        # Vectorize input
-        Xv = vectorizer.transform([text])
-        
-        # Predict
-        probabilities = model.predict_proba(Xv)[0]
-        max_idx = np.argmax(probabilities)
-        confidence = probabilities[max_idx]
-        
-        tag = model.classes_[max_idx]
+        # One predict_proba pass: label = argmax of the probabilities
+        tag, confidence = classifier.predict(text)
         
         # Threshold for confidence
         if confidence < 0.3:
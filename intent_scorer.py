@@ -0,0 +1,182 @@
+# =========================================
+# Compiled intent classifier (no scikit-learn at runtime)
+# =========================================
+import re
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from intent_classifier import IntentModel
+
+NPZ_PATH = "intent_model.npz"
+
+
+# =========================================
+# Export (run at training time, see intent_model.py)
+# =========================================
+def export_npz(pipeline, path=NPZ_PATH):
+    """
+    Save a fitted TfidfVectorizer + LogisticRegression pipeline as plain
+    arrays: vocabulary, IDF weights, coefficients, intercepts, classes
+    and the analyzer settings needed to tokenize the same way.
+    """
+    vectorizer = pipeline.steps[0][1]
+    model = pipeline.steps[-1][1]
+    if not hasattr(model, "coef_"):
+        raise ValueError(f"Can't export {type(model).__name__}: only linear models are supported")
+
+    unsupported = [name for name in ("tokenizer", "stop_words", "strip_accents")
+                   if getattr(vectorizer, name) is not None]
+    if vectorizer.analyzer not in ("word", "char_wb"):
+        unsupported.append(f"analyzer={vectorizer.analyzer}")
+
+    # The only custom preprocessor we know how to reproduce
+    normalize = ""
+    if vectorizer.preprocessor is not None:
+        import nlu
+        if vectorizer.preprocessor is nlu.normalize_devanagari:
+            normalize = "devanagari"
+        else:
+            unsupported.append("preprocessor")
+    if unsupported or vectorizer.binary or not vectorizer.use_idf:
+        raise ValueError(f"Can't export vectorizer settings: {unsupported or 'binary / use_idf'}")
+
+    terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    np.savez_compressed(
+        path,
+        terms=np.array(terms, dtype=str),
+        idf=vectorizer.idf_,
+        coef=model.coef_,
+        intercept=model.intercept_,
+        classes=np.array(model.classes_, dtype=str),
+        analyzer=vectorizer.analyzer,
+        token_pattern=vectorizer.token_pattern or "",
+        ngram_range=np.array(vectorizer.ngram_range),
+        lowercase=vectorizer.lowercase,
+        sublinear_tf=vectorizer.sublinear_tf,
+        norm=vectorizer.norm or "",
+        normalize=normalize,
+    )
+
+
+# =========================================
+# Scorer
+# =========================================
+def char_wb_ngrams(text, min_n, max_n):
+    """Character n-grams inside word boundaries, padded with spaces (sklearn char_wb)"""
+    grams = []
+    for word in text.split():
+        word = " " + word + " "
+        for n in range(min_n, max_n + 1):
+            grams += [word[i:i + n] for i in range(max(1, len(word) - n + 1))]
+            if len(word) <= n:   # a short word is counted only once
+                break
+    return grams
+
+
+class TfidfFeatures:
+    """TfidfVectorizer.transform() rebuilt from exported arrays"""
+
+    def __init__(self, terms, idf, analyzer="word", token_pattern=r"(?u)\b\w\w+\b",
+                 ngram_range=(1, 1), lowercase=True, sublinear_tf=False, norm="l2",
+                 normalize=""):
+        self.vocabulary = {term: i for i, term in enumerate(terms)}
+        self.idf = idf
+        self.analyzer = analyzer
+        self.token_re = re.compile(token_pattern) if token_pattern else None
+        self.ngram_range = tuple(ngram_range)
+        self.lowercase = lowercase
+        self.sublinear_tf = sublinear_tf
+        self.norm = norm
+        self.preprocess = None
+        if normalize == "devanagari":
+            import nlu
+            self.preprocess = nlu.normalize_devanagari
+
+    def analyze(self, text):
+        # A custom preprocessor replaces lowercasing, as in sklearn
+        if self.preprocess:
+            text = self.preprocess(text)
+        elif self.lowercase:
+            text = text.lower()
+        min_n, max_n = self.ngram_range
+
+        if self.analyzer == "char_wb":
+            return char_wb_ngrams(text, min_n, max_n)
+        tokens = self.token_re.findall(text)
+        if max_n == 1:
+            return tokens
+
+        grams = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), max_n + 1):
+            grams += [" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1)]
+        return grams
+
+    def transform(self, texts):
+        rows, cols, values = [], [], []
+        for row, text in enumerate(texts):
+            counts = {}
+            for gram in self.analyze(text):
+                col = self.vocabulary.get(gram)
+                if col is not None:
+                    counts[col] = counts.get(col, 0) + 1
+            for col in sorted(counts):
+                rows.append(row)
+                cols.append(col)
+                values.append(counts[col])
+
+        X = csr_matrix((np.array(values, dtype=np.float64), (rows, cols)),
+                       shape=(len(texts), len(self.vocabulary)))
+        if self.sublinear_tf:
+            np.log(X.data, X.data)
+            X.data += 1
+        X = X.multiply(self.idf).tocsr()
+
+        if self.norm == "l2":
+            norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+        elif self.norm == "l1":
+            norms = np.asarray(abs(X).sum(axis=1)).ravel()
+        else:
+            return X
+        norms[norms == 0] = 1.0
+        return csr_matrix(X.multiply(1 / norms[:, None]))
+
+
+class IntentScorer(IntentModel):
+    """
+    Same API as intent_classifier.IntentClassifier, computed with numpy
+    from intent_model.npz: softmax(tfidf(text) @ coef.T + intercept),
+    i.e. LogisticRegression.predict_proba.
+    """
+
+    def __init__(self, vectorizer, coef, intercept, classes):
+        self.vectorizer = vectorizer
+        self.coef_t = np.ascontiguousarray(coef.T)
+        self.intercept = intercept
+        self.classes = classes
+
+    @classmethod
+    def load(cls, path=NPZ_PATH):
+        with np.load(path) as data:
+            vectorizer = TfidfFeatures(
+                data["terms"], data["idf"],
+                analyzer=str(data["analyzer"]),
+                token_pattern=str(data["token_pattern"]),
+                ngram_range=data["ngram_range"],
+                lowercase=bool(data["lowercase"]),
+                sublinear_tf=bool(data["sublinear_tf"]),
+                norm=str(data["norm"]),
+                normalize=str(data["normalize"]) if "normalize" in data else "",
+            )
+            return cls(vectorizer, data["coef"], data["intercept"], data["classes"])
+
+    def proba(self, texts):
+        scores = self.vectorizer.transform(list(texts)) @ self.coef_t + self.intercept
+        if scores.shape[1] == 1:
+            # Binary model: one logit for classes[1]
+            p = 1 / (1 + np.exp(-scores))
+            return np.hstack([1 - p, p])
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
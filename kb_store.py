@@ -0,0 +1,293 @@
+# =========================================
+# Memory-mapped Knowledge Base Store
+# =========================================
+"""
+Single-file binary format for all knowledge-base domains.
+
+The file is opened with mmap and nothing is parsed up front except the
+domain table, so startup cost does not depend on KB size and the pages are
+shared by every process that maps the same file. No pickle is involved.
+
+Layout (all integers little-endian uint32 unless noted):
+
+    b"BKB1", n_domains
+    n_domains x (name_len, name utf-8, padding to 4, uint64 block offset)
+
+    domain block:
+        n_entries, max_key_len, n_grams, n_postings, blob_len
+        entries  : n_entries x (key_off, key_len, value_off, value_len)
+        sorted   : n_entries entry ids, ordered by key bytes
+        grams    : n_grams x (gram_off, gram_len, posting_start, posting_count),
+                   ordered by gram bytes
+        postings : n_postings entry ids
+        blob     : utf-8 strings (keys lowercased)
+
+The sections mirror the containers of knowledge_base.KBIndex (keys, values,
+exact, grams), so the same ranking code runs on top of the mapped file.
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+MAGIC = b"BKB1"
+GRAM_N = 3
+
+assert sys.byteorder == "little", "kb_store assumes a little-endian host"
+
+
+# =========================================
+# Writer
+# =========================================
+def _pad(buf):
+    buf.extend(b"\0" * (-len(buf) % 4))
+
+
+def _domain_block(kb_dict):
+    blob = bytearray()
+    strings = {}
+
+    def put(text):
+        data = text.encode("utf-8")
+        if data not in strings:
+            strings[data] = len(blob)
+            blob.extend(data)
+        return strings[data], len(data)
+
+    # Same normalisation as KBIndex.add: lowercase, last value wins
+    entries = {}
+    for key, value in kb_dict.items():
+        key = key.lower()
+        if key:
+            entries[key] = value
+    keys = list(entries)
+
+    table = array("I")
+    grams = {}
+    max_key_len = 0
+    for entry_id, key in enumerate(keys):
+        table.extend(put(key) + put(entries[key]))
+        max_key_len = max(max_key_len, len(key))
+        for gram in {key[i:i + GRAM_N] for i in range(len(key) - GRAM_N + 1)}:
+            grams.setdefault(gram, []).append(entry_id)
+
+    order = array("I", sorted(range(len(keys)), key=lambda i: keys[i].encode("utf-8")))
+
+    gram_table = array("I")
+    postings = array("I")
+    for gram in sorted(grams, key=lambda g: g.encode("utf-8")):
+        ids = grams[gram]
+        gram_table.extend(put(gram) + (len(postings), len(ids)))
+        postings.extend(ids)
+
+    block = bytearray(struct.pack(
+        "<5I", len(keys), max_key_len, len(grams), len(postings), len(blob)))
+    for section in (table, order, gram_table, postings):
+        block.extend(section.tobytes())
+    block.extend(blob)
+    _pad(block)
+    return bytes(block)
+
+
+def write_store(path, domains):
+    """
+    Write {domain name: {key: value}} to path (atomically replaced).
+    """
+    blocks = [(name, _domain_block(kb_dict)) for name, kb_dict in domains.items()]
+
+    header = bytearray(MAGIC + struct.pack("<I", len(blocks)))
+    for name, _ in blocks:
+        header.extend(struct.pack("<I", len(name.encode("utf-8"))) + name.encode("utf-8"))
+        _pad(header)
+        header.extend(b"\0" * 8)   # block offset, filled in below
+    _pad(header)
+
+    offset = len(header)
+    pos = 8
+    for name, block in blocks:
+        pos += 4 + len(name.encode("utf-8"))
+        pos += -pos % 4
+        struct.pack_into("<Q", header, pos, offset)
+        pos += 8
+        offset += len(block)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for _, block in blocks:
+            f.write(block)
+
+    os.replace(tmp_path, path)
+
+
+# =========================================
+# Reader
+# =========================================
+class _Strings:
+    """entries[id] -> key or value string, decoded on access."""
+
+    def __init__(self, buf, entries, blob_start, field):
+        self._buf = buf
+        self._entries = entries
+        self._blob = blob_start
+        self._field = field
+
+    def __len__(self):
+        return len(self._entries) // 4
+
+    def __getitem__(self, entry_id):
+        off = self._entries[4 * entry_id + self._field]
+        length = self._entries[4 * entry_id + self._field + 1]
+        start = self._blob + off
+        return bytes(self._buf[start:start + length]).decode("utf-8")
+
+
+class _SortedTable:
+    """Binary search over a table of (off, len, a, b) rows sorted by string."""
+
+    def __init__(self, buf, rows, blob_start, n_rows, ids=None):
+        self._buf = buf
+        self._rows = rows
+        self._blob = blob_start
+        self._ids = ids
+        self._n = n_rows
+
+    def _row(self, i):
+        return self._ids[i] if self._ids is not None else i
+
+    def _text(self, i):
+        row = self._row(i)
+        off, length = self._rows[4 * row], self._rows[4 * row + 1]
+        return bytes(self._buf[self._blob + off:self._blob + off + length])
+
+    def find(self, text):
+        target = text.encode("utf-8")
+        i = bisect_left(range(self._n), target, key=self._text)
+        if i < self._n and self._text(i) == target:
+            return self._row(i)
+        return None
+
+    def prefixed(self, text):
+        """
+        Yield (row, length) for every stored string that is a prefix of
+        text, stopping as soon as no stored string starts with the prefix.
+        """
+        lo = 0
+        for j in range(1, len(text) + 1):
+            prefix = text[:j].encode("utf-8")
+            lo = bisect_left(range(self._n), prefix, lo, self._n, key=self._text)
+            if lo == self._n:
+                return
+            current = self._text(lo)
+            if not current.startswith(prefix):
+                return
+            if current == prefix:
+                yield self._row(lo), j
+
+
+class _ExactMap:
+    """KBIndex.exact: key -> entry id."""
+
+    def __init__(self, table):
+        self._table = table
+
+    def get(self, key, default=None):
+        entry_id = self._table.find(key)
+        return default if entry_id is None else entry_id
+
+    def contained(self, query):
+        """KBIndex._contained: keys that are proper substrings of query."""
+        for i in range(len(query)):
+            for entry_id, length in self._table.prefixed(query[i:]):
+                if length < len(query):
+                    yield entry_id, length
+
+
+class _GramMap:
+    """KBIndex.grams: trigram -> list of entry ids."""
+
+    def __init__(self, table, rows, postings):
+        self._table = table
+        self._rows = rows
+        self._postings = postings
+
+    def get(self, gram, default=()):
+        row = self._table.find(gram)
+        if row is None:
+            return default
+        start, count = self._rows[4 * row + 2], self._rows[4 * row + 3]
+        return self._postings[start:start + count].tolist()
+
+
+class MappedDomain:
+    """
+    One domain of a KBStore, exposing the KBIndex containers
+    (keys, values, exact, grams, max_key_len) straight from the mmap.
+    """
+
+    def __init__(self, buf, offset):
+        n, self.max_key_len, n_grams, n_postings, _ = struct.unpack_from("<5I", buf, offset)
+        pos = offset + 20
+
+        def u32(count):
+            nonlocal pos
+            view = buf[pos:pos + 4 * count].cast("I")
+            pos += 4 * count
+            return view
+
+        entries = u32(4 * n)
+        order = u32(n)
+        gram_rows = u32(4 * n_grams)
+        postings = u32(n_postings)
+        blob = pos
+
+        self.keys = _Strings(buf, entries, blob, 0)
+        self.values = _Strings(buf, entries, blob, 2)
+        self.exact = _ExactMap(_SortedTable(buf, entries, blob, n, ids=order))
+        self.grams = _GramMap(_SortedTable(buf, gram_rows, blob, n_grams), gram_rows, postings)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def items(self):
+        for entry_id in range(len(self.keys)):
+            yield self.keys[entry_id], self.values[entry_id]
+
+
+class KBStore:
+    """Read-only view of a file written by write_store()."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mmap)
+
+        if bytes(self._buf[:4]) != MAGIC:
+            raise ValueError(f"{path} is not a knowledge base store")
+
+        (n_domains,) = struct.unpack_from("<I", self._buf, 4)
+        self._offsets = {}
+        pos = 8
+        for _ in range(n_domains):
+            (name_len,) = struct.unpack_from("<I", self._buf, pos)
+            name = bytes(self._buf[pos + 4:pos + 4 + name_len]).decode("utf-8")
+            pos += 4 + name_len
+            pos += -pos % 4
+            (self._offsets[name],) = struct.unpack_from("<Q", self._buf, pos)
+            pos += 8
+
+        self._domains = {}
+
+    def domains(self):
+        return list(self._offsets)
+
+    def domain(self, name):
+        """MappedDomain for name (parsed on first use), or None."""
+        if name not in self._offsets:
+            return None
+        if name not in self._domains:
+            self._domains[name] = MappedDomain(self._buf, self._offsets[name])
+        return self._domains[name]
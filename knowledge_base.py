@@ -1,25 +1,306 @@
 # =========================================
 # Knowledge Base Module
 # =========================================
-import pickle
-import re
+import heapq
+import json
+import os
+import threading
+import time
+
+from kb_store import KBStore
+
+KB_PATH = "knowledge_base.kb"   # built by convert_kb.py
+
+DOMAINS = ["history", "indian_history", "politics", "world_gk", "india_gk"]
+
+# Written by create_knowledge_base.py, compiled into KB_PATH by convert_kb.py
+KB_SOURCES = {name: f"{name}_kb.json" for name in DOMAINS}
+
+
+def load_source(path):
+    """One KB source file as {key: value}"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class KBIndex:
+    """
+    Lookup index over one knowledge-base dict, built once at load time.
+
+    exact : lowercase key -> entry id (hash lookup)
+    grams : character trigram -> entry ids (candidates for query-in-key)
+
+    Matches are ranked instead of taken in dict order:
+      1. exact key
+      2. key contained in the query, longest key first
+      3. query contained in a key, shortest key first
+    with ties broken by insertion order, so results are deterministic.
+    """
+    N = 3
+
+    def __init__(self, kb_dict=None):
+        self.keys = []
+        self.values = []
+        self.exact = {}
+        self.grams = {}
+        self.max_key_len = 0
+
+        for key, value in (kb_dict or {}).items():
+            self.add(key, value)
+
+    @classmethod
+    def from_domain(cls, domain):
+        """
+        Read-only index whose containers live in a kb_store mmap.
+        """
+        index = cls.__new__(cls)
+        index.keys = domain.keys
+        index.values = domain.values
+        index.exact = domain.exact
+        index.grams = domain.grams
+        index.max_key_len = domain.max_key_len
+        # Prefix walk over the sorted key table instead of hashing
+        index._contained = domain.exact.contained
+        return index
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def _grams(cls, text):
+        return {text[i:i + cls.N] for i in range(len(text) - cls.N + 1)}
+
+    def add(self, key, value):
+        key = key.lower()
+        if not key:
+            return
+
+        if key in self.exact:
+            self.values[self.exact[key]] = value
+            return
+
+        entry_id = len(self.keys)
+        self.keys.append(key)
+        self.values.append(value)
+        self.exact[key] = entry_id
+        for gram in self._grams(key):
+            self.grams.setdefault(gram, []).append(entry_id)
+        self.max_key_len = max(self.max_key_len, len(key))
+
+    def _contained(self, query):
+        """
+        (entry id, length) of keys that are proper substrings of query:
+        every substring up to the longest key is a hash lookup.
+        """
+        for i in range(len(query)):
+            for j in range(i + 1, min(len(query), i + self.max_key_len) + 1):
+                entry_id = self.exact.get(query[i:j])
+                if entry_id is not None and j - i < len(query):
+                    yield entry_id, j - i
+
+    def matches(self, query):
+        """
+        Yield (rank, key, value) for every matching entry, best first.
+        """
+        if not query:
+            return
+
+        # 1. Exact match
+        entry_id = self.exact.get(query)
+        if entry_id is not None:
+            yield (0, 0, entry_id), self.keys[entry_id], self.values[entry_id]
+
+        # 2. Keys inside the query, longest first
+        found = {((1, -length, entry_id), entry_id) for entry_id, length in self._contained(query)}
+        for rank, entry_id in sorted(found):
+            yield rank, self.keys[entry_id], self.values[entry_id]
+
+        # 3. Query inside keys: verify the rarest trigram's posting list
+        if len(query) >= self.N:
+            postings = [self.grams.get(g, ()) for g in self._grams(query)]
+            candidates = min(postings, key=len)
+        else:
+            candidates = range(len(self.keys))
+
+        found = []
+        for entry_id in candidates:
+            key = self.keys[entry_id]
+            if len(key) > len(query) and query in key:
+                found.append(((2, len(key), entry_id), entry_id))
+        for rank, entry_id in sorted(found):
+            yield rank, self.keys[entry_id], self.values[entry_id]
+
+    def lookup(self, query):
+        """Best matching value, or None."""
+        for rank, key, value in self.matches(query):
+            return value
+        return None
+
+    def items(self):
+        for entry_id in range(len(self.keys)):
+            yield self.keys[entry_id], self.values[entry_id]
+
+
+class LayeredIndex:
+    """
+    Base index (usually the mmap store) plus a small in-memory delta with
+    the source edits made since the store was built.
+
+    Never mutated after construction: a reload builds a new LayeredIndex
+    and swaps the reference, so in-flight lookups keep a consistent view.
+    """
+
+    def __init__(self, base, delta=None, masked=frozenset()):
+        self.base = base
+        self.delta = delta if delta is not None else KBIndex()
+        self.masked = masked      # base keys deleted or overridden by delta
+
+    def matches(self, query):
+        base = (m for m in self.base.matches(query) if m[1] not in self.masked)
+        # Merge on (tier, length); on ties the delta (newer) entry wins
+        return heapq.merge(self.delta.matches(query), base, key=lambda m: m[0][:2])
+
+    def lookup(self, query):
+        """Best matching value, or None."""
+        for rank, key, value in self.matches(query):
+            return value
+        return None
+
+    def items(self):
+        for key, value in self.base.items():
+            if key not in self.masked:
+                yield key, value
+        yield from self.delta.items()
+
+    def update(self, changed, removed=()):
+        """
+        New LayeredIndex with changed ({key: value}) and removed keys
+        applied on top of this one. Only those keys are looked up in the
+        base; the rest of the delta and mask carry over.
+        """
+        delta = dict(self.delta.items())
+        masked = set(self.masked)
+
+        for key in removed:
+            key = key.lower()
+            delta.pop(key, None)
+            if self.base.exact.get(key) is not None:
+                masked.add(key)
+
+        for key, value in changed.items():
+            key = key.lower()
+            if not key:
+                continue
+            entry_id = self.base.exact.get(key)
+            if entry_id is not None and self.base.values[entry_id] == value:
+                # Back to the store's value: drop the override
+                delta.pop(key, None)
+                masked.discard(key)
+                continue
+            delta[key] = value
+            if entry_id is not None:
+                masked.add(key)
+
+        return LayeredIndex(self.base, KBIndex(delta), frozenset(masked))
+
 
 class KnowledgeBase:
-    def __init__(self):
-        """Load all knowledge base files"""
-        self.history = self._load_kb("history_kb.pkl")
-        self.indian_history = self._load_kb("indian_history_kb.pkl")
-        self.politics = self._load_kb("politics_kb.pkl")
-        self.world_gk = self._load_kb("world_gk_kb.pkl")
-        self.india_gk = self._load_kb("india_gk_kb.pkl")
+    def __init__(self, path=KB_PATH, sources=KB_SOURCES):
+        """Map the knowledge base store; domains are read lazily"""
+        self.path = path
+        self.sources = sources      # domain -> source file watched for edits
+        self._indexes = self._open_store()
+        self._sources = {}          # domain -> source dict as of the last reload
+        self._mtimes = self._current_mtimes()
+        self._watcher = None
     
-    def _load_kb(self, filename):
-        """Load pickle file"""
+    def _open_store(self):
+        """Fresh indexes over the mapped store (empty domains if missing)"""
         try:
-            with open(filename, "rb") as f:
-                return pickle.load(f)
-        except:
-            return {}
+            store = KBStore(self.path)
+        except Exception as e:
+            print(f"❌ Failed to open knowledge base {self.path}: {e}")
+            store = None
+
+        indexes = {}
+        for name in DOMAINS:
+            domain = store.domain(name) if store else None
+            base = KBIndex.from_domain(domain) if domain is not None else KBIndex()
+            indexes[name] = LayeredIndex(base)
+        return indexes
+    
+    def _current_mtimes(self):
+        mtimes = {}
+        for path in [self.path, *self.sources.values()]:
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                mtimes[path] = None
+        return mtimes
+    
+    # =========================================
+    # Hot reload
+    # =========================================
+    def reload(self):
+        """
+        Apply changed source files without a restart.
+
+        A rebuilt store (convert_kb.py) replaces every index; an edited
+        source is diffed against its previous contents and only the changed
+        keys are applied to that domain's delta. Each change is published
+        by swapping the index dict reference, never by mutating it.
+        """
+        mtimes = self._current_mtimes()
+        changed = []
+
+        if mtimes[self.path] != self._mtimes[self.path]:
+            self._indexes = self._open_store()
+            self._sources = {}
+            changed = list(DOMAINS)
+            print("🔄 Knowledge base store reloaded")
+        else:
+            for name, path in self.sources.items():
+                if mtimes[path] == self._mtimes[path] or mtimes[path] is None:
+                    continue
+                index = self._indexes[name]
+                try:
+                    source = {k.lower(): v for k, v in load_source(path).items() if k}
+                    # First edit since the store was opened: the indexed
+                    # entries are the previous contents (read once)
+                    previous = self._sources.get(name)
+                    if previous is None:
+                        previous = dict(index.items())
+                    edits = {k: v for k, v in source.items() if previous.get(k) != v}
+                    removed = [k for k in previous if k not in source]
+                    index = index.update(edits, removed)
+                except Exception as e:
+                    print(f"❌ Failed to reload {path}: {e}")
+                    mtimes[path] = self._mtimes[path]   # retry next poll
+                    continue
+
+                self._indexes = {**self._indexes, name: index}
+                self._sources[name] = source
+                changed.append(name)
+                print(f"🔄 {name}: {len(edits)} changed, {len(removed)} removed")
+
+        self._mtimes = mtimes
+        return changed
+    
+    def watch(self, interval=2.0):
+        """Poll the store and sources in a background thread"""
+        if self._watcher is not None or not interval:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.reload()
+                except Exception as e:
+                    print(f"❌ Knowledge base reload failed: {e}")
+
+        self._watcher = threading.Thread(target=run, daemon=True)
+        self._watcher.start()
     
     def search(self, query, kb_type="all"):
         """
@@ -28,72 +309,39 @@ class KnowledgeBase:
         """
         query = query.lower().strip()
         results = []
+        indexes = self._indexes     # one consistent snapshot
         
-        # Search in history
-        if kb_type in ["history", "all"]:
-            result = self._search_in_dict(query, self.history)
-            if result:
-                results.append(("history", result))
-        
-        # Search in indian history
-        if kb_type in ["indian_history", "all"]:
-            result = self._search_in_dict(query, self.indian_history)
-            if result:
-                results.append(("indian_history", result))
-        
-        # Search in politics
-        if kb_type in ["politics", "all"]:
-            result = self._search_in_dict(query, self.politics)
-            if result:
-                results.append(("politics", result))
-        
-        # Search in world GK
-        if kb_type in ["world_gk", "all"]:
-            result = self._search_in_dict(query, self.world_gk)
-            if result:
-                results.append(("world_gk", result))
-        
-        # Search in india GK
-        if kb_type in ["india_gk", "all"]:
-            result = self._search_in_dict(query, self.india_gk)
-            if result:
-                results.append(("india_gk", result))
+        for name in DOMAINS:
+            if kb_type in [name, "all"]:
+                result = indexes[name].lookup(query)
+                if result:
+                    results.append((name, result))
         
         return results
     
-    def _search_in_dict(self, query, kb_dict):
-        """Search for exact match or partial match"""
-        # Exact match
-        for key, value in kb_dict.items():
-            if key.lower() == query:
-                return value
-        
-        # Partial match (substring)
-        for key, value in kb_dict.items():
-            if query in key.lower() or key.lower() in query:
-                return value
-        
-        return None
+    def _search(self, name, query):
+        """Best exact or partial match in one domain"""
+        return self._indexes[name].lookup(query.lower().strip())
     
     def get_history(self, query):
         """Get history information"""
-        return self._search_in_dict(query.lower(), self.history)
+        return self._search("history", query)
     
     def get_indian_history(self, query):
         """Get Indian history information"""
-        return self._search_in_dict(query.lower(), self.indian_history)
+        return self._search("indian_history", query)
     
     def get_politics(self, query):
         """Get politics information"""
-        return self._search_in_dict(query.lower(), self.politics)
+        return self._search("politics", query)
     
     def get_world_gk(self, query):
         """Get world general knowledge"""
-        return self._search_in_dict(query.lower(), self.world_gk)
+        return self._search("world_gk", query)
     
     def get_india_gk(self, query):
         """Get India general knowledge"""
-        return self._search_in_dict(query.lower(), self.india_gk)
+        return self._search("india_gk", query)
     
     def format_response(self, topic, answer):
         """Format response in Hindi"""
@@ -0,0 +1,304 @@
+# =========================================
+# Llama fallback (Qwen-style prompt)
+# =========================================
+import os
+import pickle
+import queue
+import re
+import threading
+import time
+
+import llama_cpp
+from llama_cpp import Llama
+
+import config
+
+MODEL_PATH = "Llama-3.2-1B-Instruct-Q4_K_M.gguf"
+
+SYSTEM_PROMPT = """आप एक हिंदी वॉयस असिस्टेंट हैं।
+संक्षेप में उत्तर दें।
+
+"""
+
+GEN_PARAMS = dict(
+    max_tokens=64,
+    temperature=0.6,
+    top_p=0.9,
+    repeat_penalty=1.15,
+    stop=["User:"]
+)
+
+# Streaming: speak a clause as soon as it ends on one of these. The mark
+# must be followed by whitespace, so "3.14" and "1,000" stay whole
+CLAUSE_END = re.compile(r"[।?!,.](?=\s)|\n")
+MIN_CLAUSE_CHARS = 12      # avoid speaking tiny fragments like "हाँ,"
+
+
+# =========================================
+# Load Qwen ONCE (lazily: first fallback or startup prefetch)
+# =========================================
+llm = None
+_load_lock = threading.Lock()
+
+
+def load():
+    """Load the model and cache the system prompt; no-op once loaded"""
+    global llm
+    with _load_lock:
+        if llm is not None:
+            return
+
+        print("Loading llama model...")
+        llm = Llama(
+            model_path=MODEL_PATH,
+            n_ctx=128,
+            n_threads=4,
+            n_batch=64,
+            verbose=False
+        )
+        print("Qwen ready ✅")
+
+        try:
+            warm_prefix()
+        except Exception as e:
+            print(f"⚠️ System prompt not cached: {e}")
+
+# Timings of the last query (seconds)
+last_metrics = {}
+
+
+# =========================================
+# System prompt KV state
+# =========================================
+_prefix_tokens = []
+_prefix_state = None
+
+
+def _state_key():
+    """What a saved prefix state depends on"""
+    return (MODEL_PATH, os.path.getsize(MODEL_PATH), llm.n_ctx(), SYSTEM_PROMPT,
+            getattr(llama_cpp, "__version__", None))
+
+
+def _load_prefix_state(path):
+    try:
+        with open(path, "rb") as f:
+            saved = pickle.load(f)    # our own cache file, see warm_prefix
+    except Exception:
+        return None
+
+    if saved.get("key") != _state_key():
+        return None
+    return saved["state"]
+
+
+def warm_prefix(state_path=config.LLM_PREFIX_STATE):
+    """
+    Evaluate SYSTEM_PROMPT once and keep its KV state (also on disk, so a
+    restart skips the evaluation). Every prompt starts with these tokens,
+    and llama-cpp reuses a matching prefix, so a query only evaluates the
+    "User: ..." suffix.
+    """
+    global _prefix_tokens, _prefix_state
+
+    start = time.perf_counter()
+    _prefix_tokens = llm.tokenize(SYSTEM_PROMPT.encode("utf-8"))
+
+    state = _load_prefix_state(state_path) if state_path else None
+    source = "loaded"
+    if state is not None:
+        try:
+            llm.load_state(state)
+        except Exception as e:
+            # Written by an incompatible build: evaluate it again below
+            print(f"⚠️ Saved system prompt state rejected ({e})")
+            state = None
+
+    if state is None:
+        llm.reset()
+        llm.eval(_prefix_tokens)
+        state = llm.save_state()
+        source = "evaluated"
+        if state_path:
+            tmp_path = state_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump({"key": _state_key(), "state": state}, f)
+            os.replace(tmp_path, state_path)
+
+    _prefix_state = state
+    print(f"✅ System prompt KV {source} ({len(_prefix_tokens)} tokens, "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms)")
+
+
+def _ensure_prefix():
+    """Restore the prefix state if the context no longer starts with it"""
+    if _prefix_state is None:
+        return
+    # input_ids is a fixed-size buffer: only the first n_tokens are in the
+    # KV cache, anything after that may be left over from a reset
+    n = len(_prefix_tokens)
+    if llm.n_tokens < n or list(llm.input_ids[:n]) != list(_prefix_tokens):
+        llm.load_state(_prefix_state)
+
+
+def build_prompt(hindi_text):
+    return f"""{SYSTEM_PROMPT}User: {hindi_text}
+Assistant:"""
+
+
+# =========================================
+# LLM worker
+# =========================================
+class Generation:
+    """
+    One prompt queued for the LLM worker. Text pieces arrive on `pieces`;
+    cancel() stops generation at the next token (or before it starts).
+    """
+
+    def __init__(self, prompt):
+        self.prompt = prompt
+        self.pieces = queue.Queue()
+        self.cancelled = threading.Event()
+        self.finished = False      # ran to the end, not cancelled or failed
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def __iter__(self):
+        """Yield pieces until generation ends; leaving early cancels it"""
+        try:
+            while True:
+                piece = self.pieces.get()
+                if piece is _DONE:
+                    return
+                if isinstance(piece, Exception):
+                    raise piece
+                yield piece
+        finally:
+            self.cancel()
+
+
+_DONE = object()
+_jobs = queue.Queue()
+_current = None       # Generation being run by the worker
+_worker = None
+
+
+def _run_jobs():
+    """
+    The only thread that touches llm (Llama is not thread-safe): a second
+    query waits in _jobs instead of running on the same context.
+    """
+    global _current
+    while True:
+        job = _current = _jobs.get()
+        try:
+            if not job.cancelled.is_set():
+                _ensure_prefix()
+                for chunk in llm(prompt=job.prompt, stream=True, **GEN_PARAMS):
+                    if job.cancelled.is_set():
+                        break
+                    job.pieces.put(chunk["choices"][0]["text"])
+                else:
+                    job.finished = True
+        except Exception as e:
+            job.pieces.put(e)
+        finally:
+            _current = None
+            job.pieces.put(_DONE)
+
+
+def submit(hindi_text):
+    """Queue a query for the LLM worker and return its Generation"""
+    global _worker
+    load()
+    with _load_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_run_jobs, daemon=True)
+            _worker.start()
+
+    job = Generation(build_prompt(hindi_text))
+    _jobs.put(job)
+    return job
+
+
+def cancel_all():
+    """Stop the running generation and drop queued ones (barge-in)"""
+    job = _current
+    if job is not None:
+        job.cancel()
+    while not _jobs.empty():
+        try:
+            job = _jobs.get_nowait()
+        except queue.Empty:
+            break
+        job.cancel()
+        job.pieces.put(_DONE)
+
+
+def _timed(job):
+    """Pieces of job, recording first-token and total time in last_metrics"""
+    start = time.perf_counter()
+    last_metrics.clear()
+
+    for piece in job:
+        if "first_token" not in last_metrics:
+            # Prompt processing is most of this; the prefix is already cached
+            last_metrics["first_token"] = time.perf_counter() - start
+            print(f"⏱ LLM first token {last_metrics['first_token'] * 1000:.0f} ms")
+        yield piece
+
+    last_metrics["total"] = time.perf_counter() - start
+
+
+def qwen_reply(hindi_text):
+    """Whole reply, or "" if it was cancelled before it finished"""
+    job = submit(hindi_text)
+    text = "".join(_timed(job)).strip()
+    return text if job.finished else ""
+
+
+def split_clauses(pieces):
+    """
+    Regroup streamed text into clauses ending on Hindi/ASCII punctuation
+    (।, ?, !, ",", ".", newline) so TTS can start before generation ends.
+    A mark at the end of the buffer waits for the next piece; the end of
+    the stream flushes whatever is left.
+    """
+    buffer = ""
+    for piece in pieces:
+        buffer += piece
+
+        # Cut at the last break once the clause is long enough
+        cut = max((m.end() for m in CLAUSE_END.finditer(buffer)), default=0)
+        if cut and len(buffer[:cut].strip()) >= MIN_CLAUSE_CHARS:
+            clause, buffer = buffer[:cut].strip(), buffer[cut:]
+            yield clause
+
+    if buffer.strip():
+        yield buffer.strip()
+
+
+class ReplyStream:
+    """
+    Clauses of a streamed reply (split_clauses over the generation job)
+    that remembers whether generation ran to the end. A reply cut short
+    by barge-in or an error midway leaves finished False, so it is never
+    cached as an answer.
+    """
+
+    def __init__(self, hindi_text):
+        self.hindi_text = hindi_text
+        self.clauses = []
+        self.finished = False
+
+    def __iter__(self):
+        job = submit(self.hindi_text)
+        for clause in split_clauses(_timed(job)):
+            self.clauses.append(clause)
+            yield clause
+        self.finished = job.finished
+
+    @property
+    def text(self):
+        return " ".join(self.clauses)
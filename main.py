@@ -3,290 +3,251 @@
 # =========================================
 import json
 import re
-import pickle
+import time
 
+import wake_vosk
+import wake_fast
 from wake_vosk import listen_loop
 from wake_fast import listen_for_wake  # [NEW]
-import system_info as sys
-from tts_piper import speak
-from llama_cpp import Llama
+import config
+import tts_piper
+from tts_piper import speak, speak_template, speak_stream, prewarm, template_phrases
+import llm_fallback
+from llm_fallback import ReplyStream, qwen_reply
+from startup import Startup
+from tracing import Tracer
+from handlers import NO_ANSWER, Dispatcher, default_handlers
+from intent_scorer import IntentScorer   # numpy only, no sklearn import
 import nlu  # [NEW] Deterministic NLU
 from knowledge_base import KnowledgeBase  # [NEW] Knowledge Base
 
-#from rag import SimpleRAG   # your rag.py
+from rag import SimpleRAG   # your rag.py
+from response_cache import ResponseCache
 
 
 # =========================================
-# Load INTENT MODEL (ML)
+# Load components in parallel (see startup.py)
 # =========================================
-intent_model = pickle.load(open("intent_model.pkl", "rb"))
-vectorizer = pickle.load(open("vectorizer.pkl", "rb"))
-
-# [NEW] Load Deterministic Intents
-intent_map = nlu.load_intents("intent.json")
+startup = Startup()
+startup.load("vosk (wake)", wake_fast.load_model)
+startup.load("vosk (command)", wake_vosk.load_model)
+startup.load("piper", tts_piper.load_voice)
+startup.load("intent model", IntentScorer.load)
+startup.load("intents", lambda: nlu.load_intents("intent.json"))   # [NEW] Deterministic Intents
+startup.load("knowledge base", KnowledgeBase)                      # [NEW] Knowledge Base
+startup.load("rag", lambda: SimpleRAG("rag.jsonl"))
+
+classifier = startup.wait("intent model")
+
+intent_map = startup.wait("intents")
 print(f"Loaded {len(intent_map)} deterministic keywords")
 
-# [NEW] Load Knowledge Base
-kb = KnowledgeBase()
+kb = startup.wait("knowledge base")
+kb.watch(config.KB_WATCH_INTERVAL)   # pick up KB edits without a restart
 print("✅ Knowledge Base loaded")
 
+rag = startup.wait("rag")
+rag.watch(config.KB_WATCH_INTERVAL)   # rag.jsonl edits too
+print(f"✅ RAG loaded ({len(rag.responses)} records)")
 
-def predict_intent(text):
-    X = vectorizer.transform([text])
-    intent = intent_model.predict(X)[0]
-    confidence = max(intent_model.predict_proba(X)[0])
-    return intent, confidence
-
+# Wake + command recognizers and TTS must be ready before the main loop
+startup.wait_all()
+startup.report()
 
-# =========================================
-# Load RAG
-# =========================================
-#rag = SimpleRAG("rag.jsonl")
+# The llama model is only needed for fallbacks: prefetch it in the
+# background now that the wake path is ready (qwen_reply waits if needed)
+startup.load("llama", llm_fallback.load)
 
 
-# =========================================
-# Load Qwen ONCE
-# =========================================
-MODEL_PATH = "Llama-3.2-1B-Instruct-Q4_K_M.gguf"
+def predict_intent(text):
+    return classifier.predict(text)
 
-print("Loading llama model...")
 
-llm = Llama(
-    model_path=MODEL_PATH,
-    n_ctx=128,
-    n_threads=4,
-    n_batch=64,
-    verbose=False
+def resolve_intent(text):
+    """Deterministic keywords first, then the ML model"""
+    with trace.span("nlu"):
+        intent = nlu.detect_intent(text, intent_map)
+    if intent:
+        print(f"Deterministic Match: {intent}")
+        return intent, 1.0
+    with trace.span("ml_intent"):
+        return predict_intent(text)
+
+
+# Repeated off-script questions are answered without the LLM
+response_cache = ResponseCache(
+    config.RESPONSE_CACHE_PATH,
+    max_entries=config.RESPONSE_CACHE_SIZE,
+    ttl=config.RESPONSE_CACHE_TTL,
+    min_similarity=config.RESPONSE_CACHE_SIMILARITY
 )
 
-print("Qwen ready ✅")
-
 
 # =========================================
-# Qwen fallback
+# Intent handlers (see handlers.py)
 # =========================================
-def qwen_reply(hindi_text):
-
-    prompt = f"""आप एक हिंदी वॉयस असिस्टेंट हैं।
-संक्षेप में उत्तर दें।
-
-User: {hindi_text}
-Assistant:"""
+dispatcher = Dispatcher(default_handlers(kb))
+unhandled = dispatcher.missing("intent.json")
+if unhandled:
+    print("ℹ️ Intents without a handler (answered by RAG / LLM):", unhandled)
 
-    result = llm(
-        prompt=prompt,
-        max_tokens=64,
-        temperature=0.6,
-        top_p=0.9,
-        repeat_penalty=1.15
-    )
-
-    return result["choices"][0]["text"].strip()
+# Fixed replies outside the handlers: synthesized once, then served from the TTS cache
+STATIC_RESPONSES = [
+    "मैं तैयार हूँ", "हाँ बताइए", "क्षमा करें, कुछ गलत हो गया", NO_ANSWER,
+]
 
 
 # =========================================
 # Start program
 # =========================================
+# Per-turn latency spans (JSON lines + p50/p95 summary)
+trace = Tracer(config.TRACE_PATH, enabled=config.TRACE_ENABLED)
+
 print("Program started")
+prewarm(STATIC_RESPONSES + dispatcher.phrases() + template_phrases(dispatcher.templates()))
 speak("मैं तैयार हूँ")
 
 
+# =========================================
+# Concurrent runtime with barge-in (see runtime.py)
+# =========================================
+if config.ASYNC_RUNTIME:
+    from runtime import Runtime
+    Runtime(resolve_intent, dispatcher, rag, response_cache, trace).run()
+    raise SystemExit
+
+
 # =========================================
 # Main loop
 # =========================================
 while True:
 
+    trace.finish()   # log the last turn before idling
+    if config.TRACE_SUMMARY_EVERY and trace.turns and trace.turns % config.TRACE_SUMMARY_EVERY == 0:
+        trace.report()
+
     print("\nWaiting for Wake Word (Fast)...")
     
     # 1. Block until wake word detected (Fast Mode)
-    if listen_for_wake():
-        speak("हाँ बताइए")  # [ENABLED] Acknowledge wake word
-        print("⚡ Listening for query ......")
-        print("ask me anything about system info such as time, date, cpu, ram, disk, battery, temperature, network, ip, hostname or general knowledge questions about history, Indian history, politics, world GK and India GK")
-        
-        # 2. Listen for Command (Standard Mode with Timeout)
-        # We still use the standard listen_loop for command capture as it handles full sentences better
+    result = None
+    woke = listen_for_wake()
+
+    # A turn starts at the wake word, as in runtime.py: the wait is idle time
+    trace.turn()
+    trace.note(loop="sync")
+
+    if woke:
+        # 2. One breath ("नीवा समय बताओ"): replay the pre-roll around the
+        # wake word into the command recognizer, no acknowledgement needed
+        with trace.span("capture"):
+            result = listen_loop(
+                timeout=4.5,
+                preroll=config.PREROLL_SECONDS,
+                speech_grace=config.ONE_BREATH_GRACE
+            )
+
+        if not result:
+            with trace.span("ack"):
+                speak("हाँ बताइए")  # [ENABLED] Acknowledge wake word
+            print("⚡ Listening for query ......")
+            print("ask me anything about system info such as time, date, cpu, ram, disk, battery, temperature, network, ip, hostname or general knowledge questions about history, Indian history, politics, world GK and India GK")
     
     # 3. Listen for Command (Standard Mode with Timeout)
     # We still use the standard listen_loop for command capture as it handles full sentences better
-    result = listen_loop(timeout=4.5)
+    # It returns once the speaker pauses (config.ENDPOINT_*); 4.5 s is only the upper bound
+    if not result:
+        with trace.span("capture"):
+            result = listen_loop(timeout=4.5)
     
     if not result:
         print("❌ Command timeout")
+        trace.discard()
         continue
 
     text = result["text"]
     tokens = result["tokens"]
+    heard_at = time.perf_counter()
+    trace.note(capture_end=wake_vosk.last_metrics.get("reason"))
 
     print("Heard Command:", text)
     print("Tokens:", tokens)
 
     response = None
+    template = None
+    stop = False
 
     try:
         # =====================================
-        # INTENT (Deterministic + ML)
+        # INTENT (Deterministic + ML, see resolve_intent)
         # =====================================
-        
-        # 1. Deterministic Check
-        intent = nlu.detect_intent(text, intent_map)
-        if intent:
-            conf = 1.0
-            print(f"Deterministic Match: {intent}")
-        else:
-            # 2. ML Fallback
-            intent, conf = predict_intent(text)
-        
+        intent, conf = resolve_intent(text)
         print("Intent:", intent, "Confidence:", round(conf, 2))
+        trace.note(intent=intent, confidence=round(float(conf), 3))
 
-        if conf > 0.65:   # confidence gate (VERY important)
-
-            if intent == "time":
-                response = f"अभी समय है {sys.time_now()}"
-
-            elif intent == "date":
-                response = f"आज की तारीख है {sys.date_today()}"
-
-            elif intent == "day":
-                response = f"आज {sys.day_today()} है"
-
-            elif intent == "uptime":
-                response = f"सिस्टम {sys.uptime()} से चालू है"
-
-            elif intent == "cpu":
-                response = f"सीपीयू उपयोग {sys.cpu()} है"
-
-            elif intent == "ram":
-                response = f"रैम उपयोग {sys.ram()} है"
-
-            elif intent == "disk":
-                response = f"डिस्क उपयोग {sys.disk()} है"
-
-            elif intent == "battery":
-                response = f"बैटरी {sys.battery()}"
-
-            elif intent == "temperature":
-                response = f"तापमान {sys.temp()}"
+        if conf > config.INTENT_CONFIDENCE:   # confidence gate (VERY important)
+            handler = dispatcher.get(intent)
+            if handler:
+                trace.note(handler=handler.latency)
+                with trace.span("handler"):
+                    reply = dispatcher.dispatch(intent, text)
+                response, template, slots, stop = reply.text, reply.template, reply.slots, reply.stop
 
-            elif intent == "network":
-                response = sys.network()
-
-            elif intent == "ip":
-                response = f"आईपी एड्रेस है {sys.ip()}"
-
-            elif intent == "hostname":
-                response = f"कंप्यूटर का नाम है {sys.hostname()}"
-
-            elif intent == "volume_up":
-                response = "वॉल्यूम बढ़ा रहा हूँ"
-                # Add volume up command here
-
-            elif intent == "volume_down":
-                response = "वॉल्यूम कम कर रहा हूँ"
-                # Add volume down command here
-
-            elif intent == "mute":
-                response = "म्यूट कर रहा हूँ"
-                # Add mute command here
-
-            elif intent == "brightness_up":
-                response = "स्क्रीन की चमक बढ़ा रहा हूँ"
-                # Add brightness up command here
-
-            elif intent == "brightness_down":
-                response = "स्क्रीन की चमक कम कर रहा हूँ"
-                # Add brightness down command here
-
-            elif intent == "open_camera":
-                response = "कैमरा खोल रहा हूँ"
-                # Add open camera command here
-
-            elif intent == "take_photo":
-                response = "फोटो ले रहा हूँ"
-                # Add take photo command here
-
-            elif intent == "record_video":
-                response = "वीडियो रिकॉर्ड कर रहा हूँ"
-                # Add record video command here
-
-            elif intent == "record_audio":
-                response = "ऑडियो रिकॉर्ड कर रहा हूँ"
-                # Add record audio command here
-
-            elif intent == "open_browser":
-                response = "ब्राउज़र खोल रहा हूँ"
-                # Add open browser command here
-
-            elif intent == "shutdown":
-                response = "सिस्टम बंद कर रहा हूँ"
-                # Add shutdown command here
-                break
-
-            elif intent == "restart":
-                response = "सिस्टम रीस्टार्ट कर रहा हूँ"
-                # Add restart command here
-                break
-
-            elif intent == "assistant_name":
-                response = "मेरा नाम नोवा है"
-
-            elif intent == "assistant_status":
-                response = "मैं तैयार हूँ"
-
-            elif intent == "history":
-                # Search in history knowledge base
-                answer = kb.get_history(text)
-                if answer:
-                    response = answer
-                else:
-                    response = "मुझे इस बारे में पूरी जानकारी नहीं है"
-
-            elif intent == "indian_history":
-                # Search in Indian history knowledge base
-                answer = kb.get_indian_history(text)
-                if answer:
-                    response = answer
-                else:
-                    response = "मुझे इस बारे में पूरी जानकारी नहीं है"
-
-            elif intent == "politics":
-                # Search in politics knowledge base
-                answer = kb.get_politics(text)
-                if answer:
-                    response = answer
-                else:
-                    response = "मुझे इस बारे में पूरी जानकारी नहीं है"
-
-            elif intent == "world_gk":
-                # Search in world general knowledge base
-                answer = kb.get_world_gk(text)
-                if answer:
-                    response = answer
-                else:
-                    response = "मुझे इस बारे में पूरी जानकारी नहीं है"
-
-            elif intent == "india_gk":
-                # Search in India general knowledge base
-                answer = kb.get_india_gk(text)
-                if answer:
-                    response = answer
-                else:
-                    response = "मुझे इस बारे में पूरी जानकारी नहीं है"
+        # Known facts from rag.jsonl before paying for the LLM
+        if not response:
+            with trace.span("rag"):
+                response = rag.answer(text)
+            if response:
+                print("RAG match")
+                trace.note(source="rag")
 
-            elif intent == "exit":
-                speak("अलविदा")
-                break
+        if not response:
+            with trace.span("response_cache"):
+                response = response_cache.get(text)
+            if response:
+                print("Response cache hit", response_cache.stats())
+                trace.note(source="cache")
 
         if not response:
             print("Using llama fallback")
-            response = qwen_reply(text)
+            trace.note(source="llm")
+            if config.LLM_STREAMING:
+                # Clauses are spoken while the rest is still generating
+                stream = ReplyStream(text)
+                with trace.span("llm_stream"):
+                    response = speak_stream(stream)
+                if "first_token" in llm_fallback.last_metrics:
+                    trace.add("llm_first_token", llm_fallback.last_metrics["first_token"])
+                if "first_audio_at" in tts_piper.last_metrics:
+                    trace.add("turnaround", tts_piper.last_metrics["first_audio_at"] - heard_at)
+                print("Reply:", response)
+                # Only a complete answer; not one cut off by an error
+                if stream.finished:
+                    response_cache.put(text, stream.text)
+                    if not stream.text:
+                        speak(NO_ANSWER)
+                continue
+
+            with trace.span("llm"):
+                response = qwen_reply(text)
+            response_cache.put(text, response)
+            response = response or NO_ANSWER   # end of the chain
 
         # =====================================
         # SPEAK ONCE
         # =====================================
         if response:
             print("Reply:", response)
-            speak(response)
+            with trace.span("tts"):
+                if template:
+                    speak_template(template, **slots)
+                else:
+                    speak(response)
+            # End of the command to the first sample of the reply
+            if "first_audio_at" in tts_piper.last_metrics:
+                trace.add("turnaround", tts_piper.last_metrics["first_audio_at"] - heard_at)
+
+        if stop:   # exit / shutdown / restart
+            break
 
     except KeyboardInterrupt:
         print("\nStopping...")
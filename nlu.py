@@ -1,6 +1,7 @@
 import json
 import re
 import string
+import unicodedata
 
 def load_intents(json_path):
     """
@@ -10,7 +11,7 @@ def load_intents(json_path):
         with open(json_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
             
-        intent_map = {}
+        intent_map = IntentMap()
         for intent in data['intents']:
             tag = intent['tag']
             for pattern in intent['patterns']:
@@ -20,6 +21,8 @@ def load_intents(json_path):
                     filtered_words = filter_noise(words)
                     for word in filtered_words:
                         intent_map[word] = tag
+        # Build the fuzzy index once so detect_intent never scans the map
+        intent_map.build_index()
         return intent_map
     except Exception as e:
         print(f"Error loading intents: {e}")
@@ -38,6 +41,25 @@ def preprocess(text):
     text = text.translate(str.maketrans('', '', string.punctuation))
     return text.strip()
 
+# Spelling variants that ASR output and hand-written data disagree on
+NUKTA = "\u093c"
+CHANDRABINDU = "\u0901"
+ANUSVARA = "\u0902"
+ZERO_WIDTH = dict.fromkeys(map(ord, "\u200b\u200c\u200d"), None)
+DEVANAGARI_PUNCT = dict.fromkeys(map(ord, "\u0964\u0965"), " ")   # । ॥
+
+def normalize_devanagari(text):
+    """
+    preprocess() plus Devanagari folding: NFC, nukta dropped (ज़ -> ज),
+    chandrabindu -> anusvara (हाँ -> हां), zero-width joiners and dandas
+    removed.
+    """
+    text = preprocess(text)
+    text = unicodedata.normalize("NFD", text).replace(NUKTA, "")
+    text = text.replace(CHANDRABINDU, ANUSVARA)
+    text = text.translate(ZERO_WIDTH).translate(DEVANAGARI_PUNCT)
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
 def tokenize(text):
     """
     Split by whitespace.
@@ -94,6 +116,52 @@ def get_levenshtein_distance(s1, s2):
     
     return previous_row[-1]
 
+def _deletes(word):
+    """
+    All strings obtained by deleting exactly one character.
+    """
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+class FuzzyIndex:
+    """
+    Deletion-neighbourhood (SymSpell style) index over the keywords of an
+    intent map. Any two words within Levenshtein distance 1 share at least
+    one entry of {word} + deletes(word), so a lookup only has to verify a
+    handful of candidates instead of every keyword.
+    """
+    def __init__(self, intent_map):
+        # Keywords in map order: the linear scan returned the first match
+        # in this order, so candidates are verified in the same order.
+        self.keywords = list(intent_map.keys())
+        self.variants = {}
+        for pos, keyword in enumerate(self.keywords):
+            for variant in _deletes(keyword) | {keyword}:
+                self.variants.setdefault(variant, []).append(pos)
+
+    def lookup(self, token, max_distance=1):
+        """
+        Return the first keyword (in map order) within max_distance of token.
+        """
+        candidates = set()
+        for variant in _deletes(token) | {token}:
+            candidates.update(self.variants.get(variant, ()))
+
+        for pos in sorted(candidates):
+            keyword = self.keywords[pos]
+            if get_levenshtein_distance(token, keyword) <= max_distance:
+                return keyword
+        return None
+
+class IntentMap(dict):
+    """
+    word -> intent_tag mapping that carries its own FuzzyIndex.
+    """
+    fuzzy_index = None
+
+    def build_index(self):
+        self.fuzzy_index = FuzzyIndex(self)
+        return self.fuzzy_index
+
 def detect_intent(text, intent_map):
     """
     1. Preprocess & Tokenize
@@ -110,11 +178,15 @@ def detect_intent(text, intent_map):
             return intent_map[token]
             
     # 2. Fuzzy Match (Levenshtein <= 1)
+    index = getattr(intent_map, "fuzzy_index", None)
+    if index is None:
+        # Plain dicts (e.g. built by hand) get a throwaway index
+        index = FuzzyIndex(intent_map)
+
     for token in clean_tokens:
-        for keyword, tag in intent_map.items():
-            dist = get_levenshtein_distance(token, keyword)
-            if dist <= 1:
-                return tag
+        keyword = index.lookup(token)
+        if keyword is not None:
+            return intent_map[keyword]
                 
     return None
 
@@ -0,0 +1,172 @@
+# =========================================
+# Keyword Retriever over rag.jsonl
+# =========================================
+import json
+import math
+import os
+import threading
+import time
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+import nlu
+
+
+class BM25Index:
+    """
+    Per-(record, term) BM25 weights of one rag.jsonl snapshot in a sparse
+    matrix, so scoring a query is a single matrix-vector product.
+    """
+
+    def __init__(self, docs, responses, k1=1.5, b=0.75):
+        self.responses = responses
+        self.vocab = {}
+        for terms in docs:
+            for term in terms:
+                self.vocab.setdefault(term, len(self.vocab))
+
+        n_docs = len(docs)
+        avg_len = sum(len(d) for d in docs) / n_docs if n_docs else 0.0
+
+        df = {}
+        for terms in docs:
+            for term in set(terms):
+                df[term] = df.get(term, 0) + 1
+
+        self.idf = np.zeros(len(self.vocab), dtype=np.float32)
+        for term, count in df.items():
+            self.idf[self.vocab[term]] = math.log((n_docs - count + 0.5) / (count + 0.5) + 1)
+
+        rows, cols, weights = [], [], []
+        for row, terms in enumerate(docs):
+            norm = k1 * (1 - b + b * len(terms) / avg_len)
+            for term in set(terms):
+                tf = terms.count(term)
+                rows.append(row)
+                cols.append(self.vocab[term])
+                weights.append(self.idf[self.vocab[term]] * tf * (k1 + 1) / (tf + norm))
+
+        self.matrix = csr_matrix((weights, (rows, cols)), shape=(n_docs, len(self.vocab)), dtype=np.float32)
+
+    def query_vector(self, query):
+        q = np.zeros(len(self.vocab), dtype=np.float32)
+        for term in nlu.tokenize(nlu.normalize_devanagari(query)):
+            col = self.vocab.get(term)
+            if col is not None:
+                q[col] += 1
+        return q
+
+
+class SimpleRAG:
+    """
+    BM25 over the `keywords` field of rag.jsonl.
+
+    Topic words ("इतिहास", "मुगल") are shared by many records and can add
+    up past min_score without naming any of them, so an answer also needs
+    one matched term with IDF >= min_idf and a unique best record.
+
+    watch() rebuilds the index when rag.jsonl changes; the new index is
+    published by swapping one reference, like KnowledgeBase.reload().
+    """
+
+    def __init__(self, path, k1=1.5, b=0.75, min_score=3.0, min_idf=4.0):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.min_score = min_score
+        self.min_idf = min_idf
+        self._watcher = None
+
+        self._mtime = self._current_mtime()
+        self.index = self._build()
+
+    def _current_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _build(self):
+        docs, responses = [], []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    terms = []
+                    for keyword in record["keywords"]:
+                        terms += nlu.tokenize(nlu.normalize_devanagari(keyword))
+                    docs.append(terms)
+                    responses.append(record["response"])
+        except Exception as e:
+            print(f"Error loading RAG data: {e}")
+
+        return BM25Index(docs, responses, self.k1, self.b)
+
+    @property
+    def responses(self):
+        return self.index.responses
+
+    # =========================================
+    # Hot reload
+    # =========================================
+    def reload(self):
+        """Rebuild the index if rag.jsonl changed; True if it was reloaded"""
+        mtime = self._current_mtime()
+        if mtime == self._mtime or mtime is None:
+            return False
+
+        self._mtime = mtime
+        self.index = self._build()
+        print(f"🔄 RAG reloaded ({len(self.index.responses)} records)")
+        return True
+
+    def watch(self, interval=2.0):
+        """Poll rag.jsonl in a background thread"""
+        if self._watcher is not None or not interval:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.reload()
+                except Exception as e:
+                    print(f"❌ RAG reload failed: {e}")
+
+        self._watcher = threading.Thread(target=run, daemon=True)
+        self._watcher.start()
+
+    # =========================================
+    # Retrieval
+    # =========================================
+    def scores(self, query):
+        """BM25 score of every record for query."""
+        index = self.index
+        return index.matrix @ index.query_vector(query)
+
+    def retrieve(self, query):
+        """(response, score) of the best record, or (None, 0.0) if none stands out."""
+        index = self.index     # one consistent snapshot
+        if not index.responses:
+            return None, 0.0
+
+        q = index.query_vector(query)
+        # Only generic topic words matched: they don't pick out one record
+        if not (index.idf[q > 0] >= self.min_idf).any():
+            return None, 0.0
+
+        scores = index.matrix @ q
+        best = int(np.argmax(scores))
+        if (scores >= scores[best]).sum() > 1:   # tie: argmax would just pick the first
+            return None, 0.0
+        return index.responses[best], float(scores[best])
+
+    def answer(self, query):
+        """Best response if it clears min_score, else None."""
+        response, score = self.retrieve(query)
+        if response is None or score < self.min_score:
+            return None
+        return response
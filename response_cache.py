@@ -0,0 +1,194 @@
+# =========================================
+# Response cache in front of the llama fallback
+# =========================================
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import nlu
+
+# Dropped by nlu.filter_noise, but "2 plus 2" and "3 plus 3" are different questions
+NUMBER_WORDS = {"ek", "do", "teen", "char", "paanch", "एक", "दो", "तीन", "चार", "पांच"}
+
+
+def is_number(token):
+    return token in NUMBER_WORDS or any(c.isdigit() for c in token)
+
+
+def normalize_query(text):
+    """Cache key: normalized text without stopwords / noise tokens (numbers kept)."""
+    tokens = nlu.tokenize(nlu.normalize_devanagari(text))
+    kept = set(nlu.filter_noise(tokens))
+    return " ".join(t for t in tokens if t in kept or is_number(t))
+
+
+class QueryIndex:
+    """
+    Word TF-IDF over the cached keys themselves (fitted on every change).
+
+    A token the cache has never seen would simply drop out of the query
+    vector, so a query with one is never a near duplicate; numbers must
+    match exactly. Only then does cosine similarity decide.
+    """
+
+    def __init__(self, keys):
+        self.keys = keys
+        df = {}
+        for key in keys:
+            for term in set(key.split()):
+                df[term] = df.get(term, 0) + 1
+        n = len(keys)
+        self.idf = {term: math.log((1 + n) / (1 + count)) + 1 for term, count in df.items()}
+        self.vectors = [self.vector(key) for key in keys]
+
+    def vector(self, key):
+        """L2-normalized {term: weight}"""
+        weights = {}
+        for term in key.split():
+            weights[term] = weights.get(term, 0.0) + self.idf.get(term, 0.0)
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {term: w / norm for term, w in weights.items()}
+
+    def nearest(self, key, min_similarity):
+        """Most similar cached key, or None."""
+        terms = key.split()
+        if not terms or any(term not in self.idf for term in terms):
+            return None
+        numbers = sorted(t for t in terms if is_number(t))
+
+        query = self.vector(key)
+        best, best_score = None, min_similarity
+        for cached, vector in zip(self.keys, self.vectors):
+            if sorted(t for t in cached.split() if is_number(t)) != numbers:
+                continue
+            score = sum(w * vector.get(term, 0.0) for term, w in query.items())
+            if score >= best_score:
+                best, best_score = cached, score
+        return best
+
+
+class ResponseCache:
+    """
+    Bounded LRU + TTL cache of LLM answers keyed on normalized query text.
+
+    With fuzzy=True, a miss on the exact key falls back to the most
+    similar cached query (see QueryIndex, cosine >= min_similarity).
+    Entries are persisted as JSON so answers survive restarts.
+    """
+
+    def __init__(self, path=None, max_entries=256, ttl=None,
+                 fuzzy=True, min_similarity=0.9):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.fuzzy = fuzzy
+        self.min_similarity = min_similarity
+
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (response, created_at)
+        self._index = None              # QueryIndex of the cached keys
+
+        self._load()
+
+    # ---------------------------------
+    # Persistence
+    # ---------------------------------
+    def _load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for key, response, created_at in json.load(f):
+                    self._entries[key] = (response, created_at)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"⚠️ Could not read response cache {self.path}: {e}")
+
+        self._expire()
+        self._reindex()
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump([[k, r, t] for k, (r, t) in self._entries.items()], f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    # ---------------------------------
+    # Internals
+    # ---------------------------------
+    def _expired(self, created_at):
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def _expire(self):
+        for key in [k for k, (_, t) in self._entries.items() if self._expired(t)]:
+            del self._entries[key]
+
+    def _reindex(self):
+        """Refit the near-duplicate index on the current keys"""
+        if not self.fuzzy or not self._entries:
+            self._index = None
+            return
+        self._index = QueryIndex(list(self._entries))
+
+    def _nearest(self, key):
+        if self._index is None:
+            return None
+        return self._index.nearest(key, self.min_similarity)
+
+    # ---------------------------------
+    # API
+    # ---------------------------------
+    def get(self, text):
+        key = normalize_query(text)
+        if not key:
+            return None
+
+        with self._lock:
+            match = key if key in self._entries else self._nearest(key)
+            if match is not None and match in self._entries:
+                response, created_at = self._entries[match]
+                if not self._expired(created_at):
+                    self._entries.move_to_end(match)
+                    if match == key:
+                        self.hits += 1
+                    else:
+                        self.near_hits += 1
+                    return response
+
+            self.misses += 1
+            return None
+
+    def put(self, text, response):
+        key = normalize_query(text)
+        if not key or not response or not response.strip():
+            return
+
+        with self._lock:
+            self._entries[key] = (response, time.time())
+            self._entries.move_to_end(key)
+            self._expire()
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._reindex()
+            self._save()
+
+    def stats(self):
+        total = self.hits + self.near_hits + self.misses
+        rate = (self.hits + self.near_hits) / total if total else 0.0
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": rate,
+        }
@@ -0,0 +1,267 @@
+# =========================================
+# Concurrent assistant runtime (asyncio)
+# =========================================
+import asyncio
+import time
+
+import config
+import llm_fallback
+import tts_piper
+from audio_capture import get_capture
+from handlers import NO_ANSWER
+from llm_fallback import ReplyStream, qwen_reply
+from tts_piper import speak, speak_stream, speak_template
+from wake_fast import listen_for_wake
+from wake_vosk import listen_loop
+
+ACK = "हाँ बताइए"
+
+
+class Turn:
+    """One command from wake word to reply, with its timestamps"""
+
+    def __init__(self, result, generation, tts_token, woke_at, heard_at):
+        self.text = result["text"]
+        self.tokens = result["tokens"]
+        self.generation = generation   # Runtime.generation when it was heard
+        self.tts_token = tts_token     # tts_piper.generation() after its barge-in
+        self.woke_at = woke_at
+        self.heard_at = heard_at       # command capture finished
+        self.spans = {"capture": heard_at - woke_at}
+        self.fields = {"loop": "async"}
+
+
+class Speech:
+    """A reply waiting for the player"""
+
+    def __init__(self, turn, text=None, template=None, slots=None,
+                 segments=None, stop=False, on_spoken=None):
+        self.turn = turn
+        self.text = text
+        self.template = template
+        self.slots = slots or {}
+        self.segments = segments       # streamed LLM clauses
+        self.stop = stop
+        self.on_spoken = on_spoken     # called with the full text if not interrupted
+
+
+class Runtime:
+    """
+    Listener, worker and player run as concurrent tasks connected by
+    queues:
+
+        listener --commands--> worker --speech--> player
+
+    The listener goes back to wake-word spotting as soon as a command is
+    captured, so the assistant can be interrupted while it thinks or
+    speaks. A new wake word stops playback, cancels the command being
+    handled and drops queued replies (barge-in).
+
+    Blocking pieces (Vosk, llama, Piper) run in threads via
+    asyncio.to_thread, so the event loop itself never blocks. Cancelling a
+    task doesn't stop its thread, so barge-in also cancels the LLM
+    generation (llm_fallback runs one at a time) and moves the TTS
+    generation on, which stops any reply that was synthesizing or about
+    to play.
+    """
+
+    def __init__(self, resolve_intent, dispatcher, rag, response_cache, trace):
+        self.resolve_intent = resolve_intent
+        self.dispatcher = dispatcher
+        self.rag = rag
+        self.response_cache = response_cache
+        self.trace = trace
+
+        self.generation = 0      # bumped on every wake word; older work is stale
+        self.current = None      # task handling the latest command
+        self.commands = None
+        self.speech = None
+        self.stopped = None
+
+    # ---------------------------------
+    # Barge-in
+    # ---------------------------------
+    def barge_in(self):
+        self.generation += 1
+        tts_piper.stop_speaking()
+        llm_fallback.cancel_all()
+
+        if self.current is not None and not self.current.done():
+            self.current.cancel()
+        for q in (self.commands, self.speech):
+            while not q.empty():
+                q.get_nowait()
+
+    def stale(self, turn):
+        return turn.generation != self.generation
+
+    # ---------------------------------
+    # Tasks
+    # ---------------------------------
+    async def listener(self):
+        while not self.stopped.is_set():
+            if not await asyncio.to_thread(listen_for_wake):
+                break   # no recognizer or capture closed
+
+            woke_at = time.perf_counter()
+            self.barge_in()
+            tts_token = tts_piper.generation()
+
+            # One breath first, then acknowledge and listen again
+            result = await asyncio.to_thread(
+                listen_loop,
+                timeout=4.5,
+                preroll=config.PREROLL_SECONDS,
+                speech_grace=config.ONE_BREATH_GRACE
+            )
+            if not result:
+                await asyncio.to_thread(speak, ACK, tts_token)
+                result = await asyncio.to_thread(listen_loop, timeout=4.5)
+
+            if not result:
+                print("❌ Command timeout")
+                continue
+
+            print("Heard Command:", result["text"])
+            await self.commands.put(Turn(result, self.generation, tts_token, woke_at, time.perf_counter()))
+
+        self.stopped.set()
+
+    async def worker(self):
+        while True:
+            turn = await self.commands.get()
+            if self.stale(turn):
+                continue
+
+            self.current = asyncio.create_task(self.handle(turn))
+            await asyncio.wait([self.current])
+
+            if self.current.cancelled():
+                print("⏹ Interrupted:", turn.text)
+            elif self.current.exception():
+                print("Error:", self.current.exception())
+                await self.speech.put(Speech(turn, "क्षमा करें, कुछ गलत हो गया"))
+
+    async def handle(self, turn):
+        text = turn.text
+
+        start = time.perf_counter()
+        intent, conf = self.resolve_intent(text)
+        turn.spans["intent"] = time.perf_counter() - start
+        turn.fields.update(intent=intent, confidence=round(float(conf), 3))
+        print("Intent:", intent, "Confidence:", round(conf, 2))
+
+        # Registered handler (slow ones resolve in the dispatcher's pool)
+        future = self.dispatcher.submit(intent, text) if conf > config.INTENT_CONFIDENCE else None
+        if future is not None:
+            start = time.perf_counter()
+            reply = await asyncio.wrap_future(future)
+            turn.spans["handler"] = time.perf_counter() - start
+            turn.fields["source"] = "handler"
+            if reply.text:
+                await self.speech.put(Speech(turn, reply.text, reply.template, reply.slots, stop=reply.stop))
+                return
+
+        response = self.rag.answer(text)
+        if response:
+            turn.fields["source"] = "rag"
+        else:
+            response = self.response_cache.get(text)
+            if response:
+                turn.fields["source"] = "cache"
+
+        if not response:
+            print("Using llama fallback")
+            turn.fields["source"] = "llm"
+            if config.LLM_STREAMING:
+                # Generated lazily while the player speaks it; barge-in
+                # stops the player pulling clauses, which stops llama too
+                stream = ReplyStream(text)
+
+                def remember(spoken):
+                    if stream.finished:   # not cut short by barge-in or an error
+                        self.response_cache.put(text, stream.text)
+
+                await self.speech.put(Speech(turn, segments=stream, on_spoken=remember))
+                return
+
+            start = time.perf_counter()
+            response = await asyncio.to_thread(qwen_reply, text)
+            turn.spans["llm"] = time.perf_counter() - start
+            if self.stale(turn):
+                return   # a newer wake word arrived while it was generating
+            self.response_cache.put(text, response)
+            response = response or NO_ANSWER   # end of the chain
+
+        await self.speech.put(Speech(turn, response))
+
+    async def player(self):
+        while True:
+            item = await self.speech.get()
+            if self.stale(item.turn):
+                continue
+
+            start = time.perf_counter()
+            await asyncio.to_thread(self.play, item)
+            self.record(item, start)
+
+            if item.stop:
+                self.stopped.set()
+
+    def play(self, item):
+        """Speak one reply (runs in a worker thread)"""
+        token = item.turn.tts_token
+        if item.segments is not None:
+            spoken = speak_stream(item.segments, token)
+            if not spoken and getattr(item.segments, "finished", False):
+                speak(NO_ANSWER, token)   # the LLM had nothing to say
+        else:
+            print("Reply:", item.text)
+            spoken = item.text
+            if item.template:
+                speak_template(item.template, token, **item.slots)
+            else:
+                speak(item.text, token)
+
+        if item.on_spoken and not tts_piper.interrupted(token):
+            item.on_spoken(spoken)
+
+    def record(self, item, started):
+        turn = item.turn
+        turn.spans["tts"] = time.perf_counter() - started
+        turn.fields["interrupted"] = tts_piper.interrupted(turn.tts_token)
+
+        first_audio = tts_piper.last_metrics.get("first_audio_at")
+        if first_audio and first_audio > turn.heard_at:
+            # End of the command to the first sample of the reply
+            turn.spans["turnaround"] = first_audio - turn.heard_at
+        self.trace.record(time.perf_counter() - turn.woke_at, turn.spans, **turn.fields)
+
+    # ---------------------------------
+    # Entry point
+    # ---------------------------------
+    async def main(self):
+        self.commands = asyncio.Queue()
+        self.speech = asyncio.Queue()
+        self.stopped = asyncio.Event()
+
+        tasks = [
+            asyncio.create_task(self.listener()),
+            asyncio.create_task(self.worker()),
+            asyncio.create_task(self.player()),
+        ]
+        await self.stopped.wait()
+
+        # Closing the capture ends the blocked listen_for_wake/listen_loop threads
+        get_capture().close()
+        tts_piper.stop_speaking()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def run(self):
+        try:
+            asyncio.run(self.main())
+        except KeyboardInterrupt:
+            print("\nStopping...")
+            get_capture().close()
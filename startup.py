@@ -0,0 +1,54 @@
+# =========================================
+# Startup orchestrator
+# =========================================
+import threading
+import time
+
+
+class Startup:
+    """
+    Load components concurrently in background threads.
+
+    Model loads (Vosk, Piper, llama) spend most of their time in native
+    code with the GIL released, so running them side by side cuts boot
+    time to roughly the slowest component instead of the sum.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timings = {}      # name -> seconds
+        self._threads = {}
+        self._results = {}
+        self._errors = {}
+
+    def load(self, name, fn):
+        """Start fn() in a background thread under name"""
+        def run():
+            start = time.perf_counter()
+            try:
+                self._results[name] = fn()
+            except Exception as e:
+                self._errors[name] = e
+            finally:
+                self.timings[name] = time.perf_counter() - start
+
+        thread = threading.Thread(target=run, name=f"load-{name}", daemon=True)
+        self._threads[name] = thread
+        thread.start()
+
+    def wait(self, name):
+        """Block until name is loaded; return its result (re-raise errors)"""
+        self._threads[name].join()
+        if name in self._errors:
+            raise self._errors[name]
+        return self._results.get(name)
+
+    def wait_all(self, exclude=()):
+        for name in list(self._threads):
+            if name not in exclude:
+                self.wait(name)
+
+    def report(self):
+        print(f"⏱ Startup {time.perf_counter() - self.started:.2f} s")
+        for name, seconds in sorted(self.timings.items(), key=lambda kv: -kv[1]):
+            print(f"   {name:<16} {seconds * 1000:8.0f} ms")
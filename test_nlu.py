@@ -16,6 +16,8 @@ test_inputs = [
     ("कुछश दिन", "day"),         # Devanagari noise + match
     ("समय", "time"),
     ("बंद करो", "exit"),         # "karo" stopword, "band" (बंद) matches
+    ("समाय बताओ", "time"),       # Fuzzy: one extra matra
+    ("बेटरी", "battery"),         # Fuzzy: one substituted matra
 ]
 
 print("\n--- Testing Intent Detection ---")
@@ -0,0 +1,176 @@
+# =========================================
+# Per-turn latency spans
+# =========================================
+import atexit
+import json
+import sys
+import time
+from collections import defaultdict, deque
+
+import numpy as np
+
+
+class _NullSpan:
+    """Shared no-op span used when tracing is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Tracer:
+    """
+    Collects named timing spans (monotonic clock) for one assistant turn
+    at a time and appends each finished turn as a JSON line:
+
+        {"turn": 3, "time": 1718000000.0, "total_ms": 812.4,
+         "spans": {"capture": 640.2, "nlu": 0.4, ...},
+         "intent": "time"}
+
+    The last `window` values of every span feed the p50/p95 summary.
+    When disabled, span() returns a shared no-op object.
+    """
+
+    def __init__(self, path=None, enabled=True, window=500):
+        self.path = path
+        self.enabled = enabled
+        self.turns = 0
+        self._spans = {}
+        self._fields = {}
+        self._started = None
+        self._history = defaultdict(lambda: deque(maxlen=window))
+        self._file = None
+
+        if enabled and path:
+            self._file = open(path, "a", encoding="utf-8")
+            atexit.register(self.close)
+
+    def turn(self):
+        """Finish the current turn (if any) and start the next"""
+        if not self.enabled:
+            return
+        self.finish()
+        self._started = time.perf_counter()
+
+    def span(self, name):
+        """with tracer.span("nlu"): ... adds the block's duration to name"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def add(self, name, seconds):
+        """Record a duration measured elsewhere (summed if repeated)"""
+        # Outside turn() (the async runtime records whole turns) there is
+        # nothing to add to
+        if self.enabled and self._started is not None:
+            self._spans[name] = self._spans.get(name, 0.0) + seconds
+
+    def note(self, **fields):
+        """Attach extra fields (intent, answer source, ...) to this turn"""
+        if self.enabled:
+            self._fields.update(fields)
+
+    def finish(self):
+        if self._started is None:
+            return
+
+        self.record(time.perf_counter() - self._started, self._spans, **self._fields)
+        self.discard()
+
+    def discard(self):
+        """Drop the current turn without logging it (e.g. no command heard)"""
+        self._spans = {}
+        self._fields = {}
+        self._started = None
+
+    def record(self, total, spans, **fields):
+        """Log one complete turn (used directly when turns overlap)"""
+        if not self.enabled:
+            return
+
+        self.turns += 1
+        record = {
+            "turn": self.turns,
+            "time": time.time(),
+            "total_ms": round(total * 1000, 2),
+            "spans": {k: round(v * 1000, 2) for k, v in spans.items()},
+        }
+        record.update(fields)
+
+        for name, seconds in spans.items():
+            self._history[name].append(seconds)
+        self._history["total"].append(total)
+
+        if self._file:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def close(self):
+        self.finish()
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def summary(self):
+        """name -> (count, p50 ms, p95 ms) over the recent window"""
+        return percentiles({k: list(v) for k, v in self._history.items()})
+
+    def report(self):
+        print_summary(self.summary())
+
+
+def percentiles(samples):
+    out = {}
+    for name, values in samples.items():
+        if values:
+            values = np.asarray(values) * 1000
+            out[name] = (len(values), float(np.percentile(values, 50)), float(np.percentile(values, 95)))
+    return out
+
+
+def print_summary(summary):
+    print(f"⏱ {'stage':<16} {'n':>5} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, (count, p50, p95) in sorted(summary.items(), key=lambda kv: -kv[1][1]):
+        print(f"   {name:<16} {count:>5} {p50:9.1f} {p95:9.1f}")
+
+
+# =========================================
+# Offline summary of a trace log
+#   python tracing.py turns.jsonl [field=value ...]
+# e.g. "loop=async" to compare the two main loops
+# =========================================
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "turns.jsonl"
+    filters = dict(arg.split("=", 1) for arg in sys.argv[2:])
+
+    samples = defaultdict(list)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if any(str(record.get(k)) != v for k, v in filters.items()):
+                continue
+            samples["total"].append(record["total_ms"] / 1000)
+            for name, ms in record["spans"].items():
+                samples[name].append(ms / 1000)
+    print_summary(percentiles(samples))
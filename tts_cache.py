@@ -0,0 +1,110 @@
+import hashlib
+import json
+import mmap
+import os
+import threading
+from collections import OrderedDict
+
+# =========================================
+# Phrase-level TTS audio cache
+# =========================================
+class PhraseCache:
+    """
+    Persistent, size-bounded LRU cache of synthesized PCM.
+
+    Each entry is a raw int16 file named by its key, so a hit is just an
+    mmap of the file. The LRU order and sizes live in index.json next to
+    the audio files.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._index_path = os.path.join(directory, "index.json")
+        self._entries = OrderedDict()   # key -> size in bytes, oldest first
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def make_key(text, voice_id, syn_config):
+        """Key on the text, the voice and every SynthesisConfig parameter."""
+        params = sorted((k, repr(v)) for k, v in vars(syn_config).items())
+        raw = json.dumps([text, voice_id, params], ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    # ---------------------------------
+    # Index
+    # ---------------------------------
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".pcm")
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except Exception:
+            entries = []
+
+        for key, size in entries:
+            if os.path.exists(self._path(key)):
+                self._entries[key] = size
+
+    def _save_index(self):
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(list(self._entries.items()), f)
+        os.replace(tmp_path, self._index_path)
+
+    # ---------------------------------
+    # Lookup / store
+    # ---------------------------------
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key):
+        """Return the cached PCM as a read-only mmap, or None."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        try:
+            with open(self._path(key), "rb") as f:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+
+    def put(self, key, pcm):
+        if not pcm or len(pcm) > self.max_bytes:
+            return
+
+        tmp_path = self._path(key) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(pcm)
+        os.replace(tmp_path, self._path(key))
+
+        with self._lock:
+            self._entries[key] = len(pcm)
+            self._entries.move_to_end(key)
+            self._evict()
+            self._save_index()
+
+    def _evict(self):
+        total = sum(self._entries.values())
+        while total > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            total -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
@@ -1,81 +1,401 @@
 import os
 import platform
+import queue
+import re
+import string
 import subprocess
 import tempfile
+import threading
+import time
 import wave
+import numpy as np
 from piper import PiperVoice
 from piper.voice import SynthesisConfig
 
-PIPER_MODEL = "piper/hi_IN-priyamvada-medium.onnx"
+import config
+from tts_cache import PhraseCache
 
-# Load the voice model once at module level for better performance
+# sounddevice needs PortAudio; fall back to the WAV + player path without it
 try:
-    voice = PiperVoice.load(PIPER_MODEL)
-    print("Piper voice model loaded successfully")
+    import sounddevice as sd
 except Exception as e:
-    print(f"Error loading Piper voice model: {e}")
-    voice = None
+    print(f"sounddevice not available, using file playback: {e}")
+    sd = None
+
+PIPER_MODEL = "piper/hi_IN-priyamvada-medium.onnx"
 
+# Load the voice model once (on demand, see startup.py)
+voice = None
+_load_lock = threading.Lock()
 
-def speak(text):
-    if not text or not text.strip():
+def load_voice():
+    global voice
+    with _load_lock:
+        if voice is not None:
+            return
+        try:
+            voice = PiperVoice.load(PIPER_MODEL)
+            print("Piper voice model loaded successfully")
+        except Exception as e:
+            print(f"Error loading Piper voice model: {e}")
+            voice = None
+
+# Timings of the last speak() call (seconds)
+last_metrics = {}
+
+# Playback generation: every speak call takes the current value as its
+# token and stops as soon as stop_speaking() moves past it (barge-in).
+# Nothing resets it, so a stop that lands while a reply is still being
+# synthesized cancels that reply too.
+_generation = 0
+_generation_lock = threading.Lock()
+PLAY_SLICE = 0.1   # seconds written per stream.write, i.e. stop latency
+
+
+def generation():
+    """Token for replies that should be cut by the next stop_speaking()"""
+    return _generation
+
+
+def stop_speaking():
+    """Interrupt whatever is playing or about to play; speak calls return early"""
+    global _generation
+    with _generation_lock:
+        _generation += 1
+
+
+def interrupted(token):
+    return token != _generation
+
+# Synthesized audio for fixed phrases, persisted across restarts
+cache = PhraseCache(config.TTS_CACHE_DIR, config.TTS_CACHE_MAX_MB * 1024 * 1024)
+
+
+def make_config():
+    # Configure synthesis (optional - adjust speed, etc.)
+    syn_config = SynthesisConfig()
+    syn_config.length_scale = 1.2  # Slightly slower speech
+    return syn_config
+
+
+def synthesize(text):
+    """
+    Yield raw int16 PCM chunks as Piper produces them (one per sentence).
+    """
+    for audio_chunk in voice.synthesize(text, syn_config=make_config()):
+        yield audio_chunk.audio_int16_bytes
+
+
+def cache_key(text):
+    return PhraseCache.make_key(text, PIPER_MODEL, make_config())
+
+
+def synthesize_pcm(text, store=True):
+    """
+    Full PCM for text, from the phrase cache when possible. store=False
+    synthesizes a one-off value without adding it to the cache.
+    """
+    key = cache_key(text)
+    pcm = cache.get(key)
+    if pcm is None:
+        pcm = b"".join(synthesize(text))
+        if store:
+            cache.put(key, pcm)
+    return pcm
+
+
+def prewarm(phrases, background=True):
+    """
+    Make sure every phrase is in the cache (only misses are synthesized).
+    """
+    load_voice()
+    if voice is None:
         return
-    
+
+    def run():
+        for phrase in phrases:
+            if cache_key(phrase) not in cache:
+                synthesize_pcm(phrase)
+        print(f"✅ TTS cache warm ({len(phrases)} phrases)")
+
+    if background:
+        threading.Thread(target=run, daemon=True).start()
+    else:
+        run()
+
+
+# =========================================
+# Templates: cached fixed text + synthesized slots
+# =========================================
+TRIM_THRESHOLD = 300       # int16 amplitude treated as silence at the edges
+TRIM_MARGIN = 0.02         # seconds kept around the voiced region
+FADE = 0.01                # seconds of fade in/out at each joint
+WORD_GAP = 0.08            # seconds of silence between segments
+
+# Slot values are spoken from these cached words where possible: whole
+# numbers up to 100 (times, dates, percentages), the decimal point and units
+SLOT_NUMBERS = range(101)
+DECIMAL_POINT = "दशमलव"
+DOT = "डॉट"                # between the parts of an IP address
+UNIT_WORDS = {"%": "प्रतिशत", "°C": "डिग्री सेल्सियस"}
+SLOT_VOCABULARY = {str(n) for n in SLOT_NUMBERS} | {DECIMAL_POINT, DOT, *UNIT_WORDS.values()}
+
+
+def number_segments(word):
+    """
+    Cacheable segments for one number, or None if word isn't one:
+    "12:30:05" -> 12 30 5, "12.5" -> 12 दशमलव 5, "127.0.0.1" -> 127 डॉट 0 ...
+    """
+    if re.fullmatch(r"\d+(:\d+)+", word):
+        return [str(int(part)) for part in word.split(":")]
+    if re.fullmatch(r"\d+\.\d+", word):
+        whole, fraction = word.split(".")
+        return [str(int(whole)), DECIMAL_POINT, *fraction]   # digit by digit
+    if re.fullmatch(r"\d+(\.\d+){2,}", word):
+        segments = []
+        for part in word.split("."):
+            segments += [DOT, str(int(part))] if segments else [str(int(part))]
+        return segments
+    if re.fullmatch(r"\d+", word):
+        return [str(int(word))]
+    return None
+
+
+def template_segments(template, **slots):
+    """
+    Split a template into the text segments to synthesize.
+
+    Fixed text stays whole; slot values are split so numbers and units
+    ("12.5 %" -> "12", "दशमलव", "5", "प्रतिशत") become small reusable
+    cache entries (SLOT_VOCABULARY).
+    """
+    segments = []
+    for literal, field, spec, conversion in string.Formatter().parse(template):
+        if literal.strip():
+            segments.append(literal.strip())
+        if field is None:
+            continue
+
+        value = format(slots[field], spec or "")
+        for word in value.split():
+            unit = next((u for u in UNIT_WORDS if word.endswith(u)), None)
+            if unit:
+                word = word[:-len(unit)]
+            numbers = number_segments(word)
+            if numbers is not None:
+                segments.extend(numbers)
+            elif word.strip(".,:;"):
+                segments.append(word)
+            if unit:
+                segments.append(UNIT_WORDS[unit])
+    return segments
+
+
+def _trim(pcm, sample_rate):
+    audio = np.frombuffer(pcm, dtype=np.int16)
+    voiced = np.flatnonzero(np.abs(audio) > TRIM_THRESHOLD)
+    if len(voiced) == 0:
+        return audio[:0]
+
+    margin = int(TRIM_MARGIN * sample_rate)
+    return audio[max(0, voiced[0] - margin):voiced[-1] + margin + 1]
+
+
+def join_segments(pcms, sample_rate):
+    """
+    Trim edge silence from each segment and join them with short fades.
+    """
+    n_fade = int(FADE * sample_rate)
+    gap = np.zeros(int(WORD_GAP * sample_rate), dtype=np.float32)
+
+    parts = []
+    for pcm in pcms:
+        audio = _trim(pcm, sample_rate).astype(np.float32)
+        k = min(n_fade, len(audio) // 2)
+        if k:
+            ramp = np.linspace(0.0, 1.0, k, dtype=np.float32)
+            audio[:k] *= ramp
+            audio[-k:] *= ramp[::-1]
+        if parts:
+            parts.append(gap)
+        parts.append(audio)
+
+    if not parts:
+        return b""
+    return np.concatenate(parts).astype(np.int16).tobytes()
+
+
+def speak_template(template, token=None, **slots):
+    """
+    Speak template.format(**slots), e.g.
+    speak_template("अभी समय है {value}", value=sys.time_now()).
+
+    The fixed text and SLOT_VOCABULARY come from the phrase cache
+    (prewarmed); other slot values (a year, a hostname) are synthesized
+    each time without being added to it.
+    """
+    if token is None:
+        token = generation()
+    load_voice()
     if voice is None:
         print("ERROR: Piper voice model not loaded")
         return
 
     try:
-        print("Speaking text...")
-    except UnicodeEncodeError:
-        print("Speaking text (Unicode)")
+        start = time.perf_counter()
+        segments = template_segments(template, **slots)
+        fixed = {literal.strip() for literal, *_ in string.Formatter().parse(template)}
+        misses = sum(cache_key(s) not in cache for s in segments)
+        pcm = join_segments(
+            [synthesize_pcm(s, store=s in fixed or s in SLOT_VOCABULARY) for s in segments],
+            voice.config.sample_rate
+        )
+        print(f"⏱ Template audio ready in {(time.perf_counter() - start) * 1000:.0f} ms "
+              f"({misses}/{len(segments)} segments synthesized)")
 
-    clean_text = text.strip()
+        play([pcm], voice.config.sample_rate, token)
+    except Exception as e:
+        print(f"ERROR during speech synthesis or playback: {e}")
+
+
+def template_phrases(templates):
+    """
+    Fixed text of the templates plus the words their slots are spoken
+    with (SLOT_VOCABULARY: numbers 0-100, decimal point, units), for
+    prewarm().
+    """
+    phrases = []
+    for template in templates:
+        for literal, *_ in string.Formatter().parse(template):
+            if literal.strip() and literal.strip() not in phrases:
+                phrases.append(literal.strip())
+    return phrases + [str(n) for n in SLOT_NUMBERS] + [DECIMAL_POINT, DOT, *UNIT_WORDS.values()]
+
+
+# =========================================
+# Playback
+# =========================================
+def _play_stream(chunks, sample_rate, start, token):
+    """
+    Play chunks in-process while synthesis continues.
 
+    Synthesis runs in a producer thread so the next sentence is generated
+    while the current one is playing. The device is opened before any
+    chunk is pulled, so if that fails (sd.PortAudioError) the caller can
+    still play the same chunks another way.
+    """
+    stream = sd.RawOutputStream(samplerate=sample_rate, channels=1, dtype="int16")
+    try:
+        stream.start()
+    except sd.PortAudioError:
+        stream.close()
+        raise
+    pending = queue.Queue(maxsize=8)
+    done = object()
+
+    def put(item):
+        # Don't block forever on a full queue once playback was cut short
+        while not interrupted(token):
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for chunk in chunks:
+                if not put(chunk):
+                    return
+        except Exception as e:
+            put(e)
+        finally:
+            put(done)
+
+    threading.Thread(target=produce, daemon=True).start()
+
+    n_bytes = 0
+    step = int(PLAY_SLICE * sample_rate) * 2
+    try:
+        while not interrupted(token):
+            try:
+                chunk = pending.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if chunk is done:
+                break
+            if isinstance(chunk, Exception):
+                raise chunk
+
+            if n_bytes == 0:
+                last_metrics["first_audio"] = time.perf_counter() - start
+                last_metrics["first_audio_at"] = time.perf_counter()
+
+            # Small slices so an interrupt takes effect within PLAY_SLICE
+            for offset in range(0, len(chunk), step):
+                if interrupted(token):
+                    break
+                stream.write(chunk[offset:offset + step])
+            n_bytes += len(chunk)
+
+        if interrupted(token):
+            stream.abort()   # drop what is still queued in the device
+    finally:
+        stream.stop()    # lets queued audio finish; no-op after abort()
+        stream.close()
+
+    return n_bytes
+
+
+def _play_file(chunks, sample_rate, start, token):
+    """
+    Old path: write a temporary WAV, then hand it to aplay / PowerShell.
+    """
     # Create temporary WAV file
     wav_file = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
     wav_path = wav_file.name
     wav_file.close()
 
+    n_bytes = 0
     try:
-        # Configure synthesis (optional - adjust speed, etc.)
-        config = SynthesisConfig()
-        config.length_scale = 1.2  # Slightly slower speech
-        
-        # Synthesize the text - returns iterable of audio chunks
-        audio_chunks = voice.synthesize(clean_text, syn_config=config)
-        
-        # Get sample rate from voice config
-        sample_rate = voice.config.sample_rate
-        
         # Write audio chunks to WAV file
         with wave.open(wav_path, "wb") as wav:
             # Set WAV file parameters
             wav.setnchannels(1)  # Mono audio
             wav.setsampwidth(2)  # 16-bit audio (2 bytes per sample)
             wav.setframerate(sample_rate)
-            
+
             # Write all audio chunks
-            for audio_chunk in audio_chunks:
-                wav.writeframes(audio_chunk.audio_int16_bytes)
+            for chunk in chunks:
+                wav.writeframes(chunk)
+                n_bytes += len(chunk)
 
         # Check if file was created and has content
         if not os.path.exists(wav_path) or os.path.getsize(wav_path) == 0:
             print("ERROR: WAV file was not created or is empty")
-            return
+            return 0
+
+        last_metrics["first_audio"] = time.perf_counter() - start
+        last_metrics["first_audio_at"] = time.perf_counter()
 
         # Play the audio file
         if platform.system() == "Windows":
-            subprocess.run([
+            player = subprocess.Popen([
                 "powershell",
                 "-c",
                 f'(New-Object Media.SoundPlayer "{wav_path}").PlaySync();'
-            ], check=False)
+            ])
         else:
-            subprocess.run(["aplay", wav_path], check=False)
+            player = subprocess.Popen(["aplay", wav_path])
+
+        while player.poll() is None:
+            if interrupted(token):
+                player.terminate()
+                player.wait()
+                break
+            time.sleep(0.05)
 
-    except Exception as e:
-        print(f"ERROR during speech synthesis or playback: {e}")
     finally:
         # Clean up temporary file
         try:
@@ -83,3 +403,92 @@ def speak(text):
                 os.remove(wav_path)
         except:
             pass
+
+    return n_bytes
+
+
+def play(chunks, sample_rate, token=None):
+    """
+    Play an iterable of int16 PCM chunks, recording time-to-first-audio.
+    Nothing is played if stop_speaking() was called since token was taken.
+    """
+    if token is None:
+        token = generation()
+    start = time.perf_counter()
+    last_metrics.clear()
+    if interrupted(token):
+        return
+
+    n_bytes = None
+    if config.TTS_STREAMING and sd is not None:
+        try:
+            n_bytes = _play_stream(chunks, sample_rate, start, token)
+        except sd.PortAudioError as e:
+            # PortAudio loaded but no usable output device (none, or busy)
+            print(f"⚠️ Audio output unavailable ({e}), using file playback")
+    if n_bytes is None:
+        n_bytes = _play_file(chunks, sample_rate, start, token)
+
+    last_metrics["total"] = time.perf_counter() - start
+    last_metrics["audio"] = n_bytes / 2 / sample_rate
+
+    if "first_audio" in last_metrics:
+        print(f"⏱ TTS first audio {last_metrics['first_audio'] * 1000:.0f} ms, "
+              f"{last_metrics['audio']:.1f} s of speech")
+
+
+def speak(text, token=None):
+    if not text or not text.strip():
+        return
+    if token is None:
+        token = generation()
+
+    load_voice()
+    if voice is None:
+        print("ERROR: Piper voice model not loaded")
+        return
+
+    try:
+        print("Speaking text...")
+    except UnicodeEncodeError:
+        print("Speaking text (Unicode)")
+
+    clean_text = text.strip()
+
+    try:
+        # Fixed responses are prewarmed; anything else is synthesized live
+        pcm = cache.get(cache_key(clean_text))
+        chunks = [pcm] if pcm is not None else synthesize(clean_text)
+        play(chunks, voice.config.sample_rate, token)
+    except Exception as e:
+        print(f"ERROR during speech synthesis or playback: {e}")
+
+
+def speak_stream(segments, token=None):
+    """
+    Speak text segments (e.g. LLM clauses) as they arrive, through one
+    output stream, so playback starts before the text is complete.
+    Returns the full text spoken.
+    """
+    if token is None:
+        token = generation()
+    spoken = []
+
+    def chunks():
+        for segment in segments:
+            if interrupted(token):
+                break   # stop pulling (and generating) further text
+            print("Reply (part):", segment)
+            spoken.append(segment)
+            yield from synthesize(segment)
+
+    load_voice()
+    if voice is None:
+        print("ERROR: Piper voice model not loaded")
+        return " ".join(segments)
+
+    try:
+        play(chunks(), voice.config.sample_rate, token)
+    except Exception as e:
+        print(f"ERROR during speech synthesis or playback: {e}")
+    return " ".join(spoken)
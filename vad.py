@@ -0,0 +1,114 @@
+# =========================================
+# Energy-based voice activity detection
+# =========================================
+from collections import deque
+
+import numpy as np
+
+import config
+
+
+def frame_features(samples, frame_len):
+    """Per-frame RMS and zero-crossing rate of whole frames in samples"""
+    n = len(samples) // frame_len
+    frames = samples[:n * frame_len].reshape(n, frame_len).astype(np.float32)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_len - 1)
+    return rms, zcr
+
+
+class EnergyVAD:
+    """
+    Frame-level speech/silence gate for int16 audio blocks.
+
+    A frame is speech when its RMS exceeds the adaptive noise floor times
+    `ratio`; the threshold never drops below `min_rms` and never rises
+    above `max_rms` (config.NOISE_THRESHOLD), so loud speech always gets
+    through even in a noisy room. After speech the gate stays open for
+    `hangover` frames so word endings and short pauses are kept.
+
+    With `use_zcr`, loud frames that cross zero very often (fan hiss,
+    static) are treated as noise.
+    """
+
+    def __init__(self, rate=16000, frame_ms=20, ratio=3.0, min_rms=None,
+                 max_rms=None, hangover=15, use_zcr=None, max_zcr=0.5):
+        self.frame_len = rate * frame_ms // 1000
+        self.ratio = ratio
+        self.min_rms = config.VAD_MIN_RMS if min_rms is None else min_rms
+        self.max_rms = config.NOISE_THRESHOLD if max_rms is None else max_rms
+        self.hangover = hangover
+        self.use_zcr = config.VAD_USE_ZCR if use_zcr is None else use_zcr
+        self.max_zcr = max_zcr
+
+        self.noise_floor = None
+        self._hang = 0
+        self._rest = np.zeros(0, dtype=np.int16)
+
+        self.blocks = 0
+        self.speech_blocks = 0
+
+    def reset(self):
+        """Forget the hangover and partial frame (keeps the noise floor)"""
+        self._hang = 0
+        self._rest = np.zeros(0, dtype=np.int16)
+
+    @property
+    def threshold(self):
+        if self.noise_floor is None:
+            return self.max_rms
+        return min(max(self.noise_floor * self.ratio, self.min_rms), self.max_rms)
+
+    def is_speech(self, data):
+        """True if any frame of this block is speech (or in hangover)"""
+        samples = np.frombuffer(data, dtype=np.int16) if isinstance(data, bytes) else data
+        samples = np.concatenate([self._rest, samples])
+        rms, zcr = frame_features(samples, self.frame_len)
+        self._rest = samples[len(rms) * self.frame_len:]
+
+        active = False
+        for level, crossings in zip(rms, zcr):
+            loud = level > self.threshold
+            if loud and self.use_zcr and crossings > self.max_zcr:
+                loud = False
+
+            if loud:
+                self._hang = self.hangover
+            else:
+                # Track the floor on non-speech frames: fall fast, rise slowly
+                if self.noise_floor is None:
+                    self.noise_floor = float(level)
+                else:
+                    alpha = 0.3 if level < self.noise_floor else 0.02
+                    self.noise_floor += alpha * (level - self.noise_floor)
+                if self._hang:
+                    self._hang -= 1
+                    loud = True
+
+            active = active or loud
+
+        self.blocks += 1
+        self.speech_blocks += active
+        return active
+
+    def skipped_ratio(self):
+        return 1 - self.speech_blocks / self.blocks if self.blocks else 0.0
+
+
+class OnsetBuffer:
+    """
+    Holds the last few blocks skipped as silence so that, when the gate
+    opens, the decoder also gets the audio just before the onset.
+    """
+
+    def __init__(self, blocks=3):
+        self._blocks = deque(maxlen=blocks)
+
+    def hold(self, data):
+        self._blocks.append(data)
+
+    def drain(self):
+        blocks = list(self._blocks)
+        self._blocks.clear()
+        return blocks
@@ -1,6 +1,12 @@
 from wake_vosk import listen_loop
+from audio_capture import ReplaySource, set_capture
 import sys
 
+# Optional: verify on a recording instead of the microphone
+#   python verify_vosk.py clip.wav
+if len(sys.argv) > 1:
+    set_capture(ReplaySource.from_wav(sys.argv[1]))
+
 print("Verifying Vosk Audio Integration...")
 print("Please speak the wake word 'जार्विस' (Jarvis) or any sentence...")
 
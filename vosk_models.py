@@ -0,0 +1,57 @@
+# =========================================
+# Shared Vosk model registry
+# =========================================
+import json
+import threading
+
+from vosk import Model, KaldiRecognizer
+
+MODEL_PATH = "vosk-model-small-hi-0.22"
+SAMPLE_RATE = 16000
+
+# path -> Model; the acoustic model + graph is the big allocation,
+# recognizers on top of it are cheap
+_models = {}
+_lock = threading.Lock()
+
+
+def get_model(path=MODEL_PATH):
+    """Load the model at path once; every caller shares the same instance"""
+    with _lock:
+        model = _models.get(path)
+        if model is None:
+            model = Model(path)
+            _models[path] = model
+            print(f"✅ Vosk model loaded ({path})")
+        return model
+
+
+def recognizer(path=MODEL_PATH, sample_rate=SAMPLE_RATE, words=False):
+    """Full-vocabulary recognizer with its own decoding state"""
+    rec = KaldiRecognizer(get_model(path), sample_rate)
+    rec.SetWords(words)
+    rec.SetPartialWords(words)
+    return rec
+
+
+def grammar_recognizer(phrases, path=MODEL_PATH, sample_rate=SAMPLE_RATE, words=True):
+    """
+    Recognizer restricted to phrases (plus "[unk]" for everything else).
+    Only works with models that have a dynamic graph, like the small ones.
+    """
+    grammar = json.dumps(list(phrases) + ["[unk]"], ensure_ascii=False)
+    rec = KaldiRecognizer(get_model(path), sample_rate, grammar)
+    rec.SetWords(words)
+    return rec
+
+
+def rss_mb():
+    """Resident memory of this process in MB (Linux)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
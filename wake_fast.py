@@ -1,78 +1,185 @@
-import pyaudio
 import json
+import threading
 import numpy as np
-from vosk import Model, KaldiRecognizer
+import vosk_models
+from audio_capture import get_capture
+from vad import EnergyVAD, OnsetBuffer
+import config
 
 # =========================================
 # CONFIG
 # =========================================
 WAKE_WORDS = ["इवा", "iva", "kira", "ava", "hyva", "hey nova", "hey"]  # check multiple
-MODEL_PATH = "vosk-model-small-hi-0.22"
+MODEL_PATH = vosk_models.MODEL_PATH
 SAMPLE_RATE = 16000
 BLOCK_SIZE = 1024   # fast
 
 # =========================================
-# Load Vosk model
+# Vosk recognizer (on demand, see startup.py)
 # =========================================
-try:
-    model = Model(MODEL_PATH)
-    rec = KaldiRecognizer(model, SAMPLE_RATE)
-    print("✅ Vosk (Fast) model loaded")
-except Exception as e:
-    print("❌ Failed to load Vosk model:", e)
-    model = None
-    rec = None
+model = None
+rec = None
+_load_lock = threading.Lock()
+
+def wake_phrases(mode=None):
+    """Wake words the recognizer listens for in the given mode"""
+    mode = mode or config.WAKE_MODE
+    return config.WAKE_WORDS if mode == "grammar" else WAKE_WORDS
+
+def make_recognizer(mode=None):
+    """Fresh wake recognizer on the shared model"""
+    mode = mode or config.WAKE_MODE
+    if mode == "grammar":
+        # Only the wake words + [unk] are in the search graph, so decoding
+        # is a fraction of the full vocabulary and "hey" can't match inside
+        # longer words. Word confidences come with the final result.
+        return vosk_models.grammar_recognizer(wake_phrases(mode), MODEL_PATH, SAMPLE_RATE)
+    return vosk_models.recognizer(MODEL_PATH, SAMPLE_RATE)
+
+def load_model():
+    global model, rec
+    with _load_lock:
+        if rec is not None:
+            return
+        try:
+            # Same Model instance as wake_vosk; only the decoder is ours
+            model = vosk_models.get_model(MODEL_PATH)
+            rec = make_recognizer()
+            print(f"✅ Vosk (Fast) recognizer ready ({config.WAKE_MODE})")
+        except Exception as e:
+            print("❌ Failed to load Vosk model:", e)
+            model = None
+            rec = None
+
+# Voice activity gate (the noise floor persists across turns)
+vad = EnergyVAD(SAMPLE_RATE)
+onset = OnsetBuffer(blocks=3)   # ~0.2 s of audio before the onset
+
+# =========================================
+# Helper: Match wake words on word boundaries
+# =========================================
+def match_wake(text, phrases=None):
+    """
+    Wake phrase found as whole words in text (so "hey" does not fire on
+    "heyday" or "they"), or None.
+    """
+    tokens = text.lower().split()
+    for phrase in phrases or wake_phrases():
+        words = phrase.lower().split()
+        n = len(words)
+        if any(tokens[i:i + n] == words for i in range(len(tokens) - n + 1)):
+            return phrase
+    return None
+
+def confident_wake(result, phrases=None, min_conf=None):
+    """Wake phrase from a final result whose words all clear min_conf"""
+    min_conf = config.WAKE_CONFIDENCE if min_conf is None else min_conf
+    words = result.get("result", [])
+    if not words:
+        # No word details (SetWords off): fall back to the text alone
+        return match_wake(result.get("text", ""), phrases)
+
+    kept = " ".join(w["word"] for w in words if w.get("conf", 1.0) >= min_conf)
+    return match_wake(kept, phrases)
 
 # =========================================
 # Helper: Detect Wake from Partial Result
 # =========================================
+_stable = 0   # consecutive partials containing a wake word (grammar mode)
+
 def detect_wake(recognizer, data):
+    global _stable
+
     # Accept returns True if a full silence/end of utterance is reached
     # but we are interested in partials for speed
     if recognizer.AcceptWaveform(data):
         result = json.loads(recognizer.Result())
         text = result.get("text", "")
+        _stable = 0
+        hit = confident_wake(result) if config.WAKE_MODE == "grammar" else match_wake(text)
     else:
         # PartialResult gives us real-time hypothesis
         partial = recognizer.PartialResult()
         text = json.loads(partial).get("partial", "")
+        hit = match_wake(text)
 
-    # Check against all wake words
-    if any(w in text for w in WAKE_WORDS):
+        # Partials carry no confidence: in grammar mode require the wake
+        # word to survive a few blocks before trusting it
+        if config.WAKE_MODE == "grammar":
+            _stable = _stable + 1 if hit else 0
+            if _stable < config.WAKE_STABLE_PARTIALS:
+                hit = None
+
+    if hit:
+        _stable = 0
         recognizer.Reset() # Reset immediately after detection
         return True, text
-    
+
     return False, text
 
+def finish_wake(recognizer):
+    """Flush the decoder at the end of an utterance and check the result"""
+    global _stable
+    _stable = 0
+    result = json.loads(recognizer.FinalResult())   # also resets the decoder
+    text = result.get("text", "")
+    hit = confident_wake(result) if config.WAKE_MODE == "grammar" else match_wake(text)
+    return bool(hit), text
+
 # =========================================
 # Listen Loop
 # =========================================
 def listen_for_wake():
+    load_model()
     if not rec:
         return False
 
-    p = pyaudio.PyAudio()
+    # Shared, long-lived stream: nothing to open or close per turn
+    capture = get_capture()
+
+    # Ignore audio buffered while we were busy (e.g. our own TTS reply),
+    # and don't let the command pre-roll rewind into it either
+    capture.skip_to_live()
+    capture.mark()
 
-    stream = p.open(
-        format=pyaudio.paInt16,
-        channels=1,
-        rate=SAMPLE_RATE,
-        input=True,
-        frames_per_buffer=BLOCK_SIZE
-    )
+    print(f"⚡ Fast Listening for: {wake_phrases()}...")
+    speaking = False
 
-    print(f"⚡ Fast Listening for: {WAKE_WORDS}...")
-    
     while True:
-        data = stream.read(BLOCK_SIZE, exception_on_overflow=False)
-        data_bytes = bytes(data)
+        data_bytes = capture.read(BLOCK_SIZE)
+        if not data_bytes:
+            if capture.exhausted:
+                # End of replayed audio: a wake word may still be pending
+                wake_detected, text = finish_wake(rec)
+                if wake_detected:
+                    print(f"🔥 Wake Word Detected! ({text})")
+                return wake_detected
+            continue
+
+        # Don't run Kaldi on silence; replay the blocks just before an
+        # onset so the start of the wake word isn't clipped
+        if config.VAD_ENABLED:
+            if not vad.is_speech(data_bytes):
+                onset.hold(data_bytes)
+                if not speaking:
+                    continue
+                # Utterance over: Kaldi won't see the silence that would
+                # end it, so flush it here
+                speaking = False
+                wake_detected, text = finish_wake(rec)
+            else:
+                if not speaking:
+                    speaking = True
+                    for held in onset.drain():
+                        rec.AcceptWaveform(held)
+                wake_detected, text = detect_wake(rec, data_bytes)
+        else:
+            wake_detected, text = detect_wake(rec, data_bytes)
 
-        wake_detected, text = detect_wake(rec, data_bytes)
-        
         if wake_detected:
+            vad.reset()
+            onset.drain()
+            # The capture cursor now sits right after the wake word, so a
+            # resumed listen_loop decodes the very next samples.
             print(f"🔥 Wake Word Detected! ({text})")
             return True
-
-    stream.stop_stream()
-    stream.close()
-    p.terminate()
@@ -1,36 +1,49 @@
-import pyaudio
 import json
+import threading
 import numpy as np
-from vosk import Model, KaldiRecognizer
+import vosk_models
 import re
+from audio_capture import get_capture
+from vad import EnergyVAD, OnsetBuffer
+import config
 
 # =========================================
 # CONFIG
 # =========================================
 
 WAKE_WORDS = ["इवा", "iva", "kira", "ava", "hyva", "hey nova", "hey"]  # check multiple
-MODEL_PATH = "vosk-model-small-hi-0.22"
+MODEL_PATH = vosk_models.MODEL_PATH
 
 SAMPLE_RATE = 16000
-BLOCK_SIZE = 4000          # 0.5 sec
-RMS_THRESHOLD = 30         # VERY LOW (important)
+BLOCK_SIZE = 1600          # 0.1 sec (endpointing granularity)
 MIN_TOKENS = 1             # allow even 1-word speech
 
 
 # =========================================
-# Load Vosk model ONCE
+# Vosk recognizer (shared model, on demand, see startup.py)
 # =========================================
-try:
-    model = Model(MODEL_PATH)
-    rec = KaldiRecognizer(model, SAMPLE_RATE)
-    rec.SetWords(False)
-    rec.SetPartialWords(False)
-    print("✅ Vosk model loaded")
-except Exception as e:
-    print("❌ Failed to load Vosk model:", e)
-    model = None
-    rec = None
+model = None
+rec = None
+_load_lock = threading.Lock()
 
+def load_model():
+    global model, rec
+    with _load_lock:
+        if rec is not None:
+            return
+        try:
+            model = vosk_models.get_model(MODEL_PATH)
+            rec = vosk_models.recognizer(MODEL_PATH, SAMPLE_RATE)
+            print("✅ Vosk command recognizer ready")
+        except Exception as e:
+            print("❌ Failed to load Vosk model:", e)
+            model = None
+            rec = None
+
+
+# Voice activity gate before the first word (noise floor kept across turns)
+vad = EnergyVAD(SAMPLE_RATE, hangover=0)   # endpointing measures silence itself
+onset = OnsetBuffer(blocks=3)   # 0.3 s before the onset
 
 # =========================================
 # Tokenizer
@@ -43,6 +56,14 @@ def tokenize(text):
     return text.strip().split()
 
 
+def strip_wake(tokens):
+    """
+    Drop wake words, e.g. when a pre-roll replay starts with "नीवा".
+    """
+    wake_words = set(WAKE_WORDS) | set(config.WAKE_WORDS)
+    return [t for t in tokens if t not in wake_words]
+
+
 
 # =========================================
 # Audio device helper
@@ -58,88 +79,181 @@ def get_input_device_index():
 # =========================================
 import time  # [NEW]
 
-def listen_loop(timeout=None):  # [NEW] timeout support
+def listen_loop(timeout=None, resume=False, preroll=0.0, speech_grace=None,
+                endpoint=config.ENDPOINT_SILENCE):  # [NEW] timeout support
+    """
+    Capture one command from the shared audio stream.
+
+    resume=True continues from the capture cursor (e.g. right after the
+    wake word); otherwise decoding starts with fresh audio.
+
+    preroll (seconds) rewinds the cursor first, replaying audio spoken
+    with the wake word so "नीवा समय बताओ" works in one breath, but never
+    past where listen_for_wake started. Wake words are stripped from the
+    result in this mode.
+
+    speech_grace (seconds): give up early (return None) if nothing but
+    wake words has been heard by then.
+
+    endpoint (seconds): finish as soon as this much silence follows
+    speech, without waiting for Vosk's own endpointer (see
+    endpoint_silence). None disables it; timeout stays the hard limit.
+    """
+    load_model()
     if not rec:
         print("❌ Vosk not ready")
         return None
 
     rec.Reset()
+    last_metrics.clear()
 
     try:
-        p = pyaudio.PyAudio()
-
-        stream = p.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=SAMPLE_RATE,
-            input=True,
-            frames_per_buffer=BLOCK_SIZE,
-            stream_callback=None
-        )
+        capture = get_capture()
+        if preroll:
+            # Not before listen_for_wake started (capture.mark()): that
+            # audio is our own reply, or the one being barged into
+            capture.rewind(int(preroll * SAMPLE_RATE))
+        elif not resume:
+            capture.skip_to_live()
 
         print("🎤 Listening...")
-        start_time = time.time()  # [NEW]
+        start_time = capture.clock()  # [NEW] wall time (audio time when replaying)
+        heard_speech = False
+        # Replayed pre-roll starts mid-speech: decode it all
+        gate_open = bool(preroll)
+        vad.reset()
+        onset.drain()
+
+        # Endpointing runs on audio time, so replayed pre-roll counts too
+        block_seconds = BLOCK_SIZE / SAMPLE_RATE
+        audio_time = 0.0
+        first_speech = None
+        speech = 0.0        # seconds of audio from first speech to last
+        silence = 0.0       # trailing silence after the last speech block
 
         while True:
+            # Nothing beyond the wake word within the grace window
+            if speech_grace and not heard_speech and (capture.clock() - start_time > speech_grace):
+                return None
+
             # [NEW] Check timeout
-            if timeout and (time.time() - start_time > timeout):
+            if timeout and (capture.clock() - start_time > timeout):
                 print("⏰ Timeout reached")
                 
                 # Try to get partial result!
                 partial = rec.PartialResult()
-                p_text = json.loads(partial).get("partial", "").strip()
-                
-                if p_text:
-                    print(f"⚠️ Recovered partial command: {p_text}")
-                    tokens = tokenize(p_text)
-                    wake = any(t in WAKE_WORDS for t in tokens)
-                    return {
-                        "wake": wake,
-                        "text": p_text,
-                        "tokens": tokens
-                    }
-                
-                return None
+                result = make_result(json.loads(partial).get("partial", ""), preroll)
+                if result:
+                    print(f"⚠️ Recovered partial command: {result['text']}")
+                    record_metrics("timeout", capture.clock() - start_time, first_speech, speech, silence)
+                return result
 
-            data = stream.read(BLOCK_SIZE, exception_on_overflow=False)
-
-            audio_np = np.frombuffer(data, dtype=np.int16)
+            data = capture.read(BLOCK_SIZE)
+            if not data:
+                if capture.exhausted:
+                    # End of replayed audio: take whatever was decoded
+                    result = make_result(json.loads(rec.FinalResult()).get("text", ""), preroll)
+                    if result:
+                        record_metrics("eof", capture.clock() - start_time, first_speech, speech, silence)
+                    return result
+                continue
+            audio_time += block_seconds
 
             # ---------------------------------
-            # Light noise gate
+            # Noise gate: skip silence until speech starts; after that
+            # Kaldi needs the pauses to find the end of the utterance
             # ---------------------------------
-            rms = np.sqrt(np.mean(audio_np.astype(np.float32) ** 2))
-            if rms < RMS_THRESHOLD:
-                continue
+            is_speech = vad.is_speech(data)
+            if config.VAD_ENABLED and not gate_open:
+                if not is_speech:
+                    onset.hold(data)
+                    continue
+                gate_open = True
+                for held in onset.drain():
+                    rec.AcceptWaveform(held)
+
+            if is_speech:
+                if first_speech is None:
+                    first_speech = audio_time - block_seconds
+                speech += silence + block_seconds
+                silence = 0.0
+            elif first_speech is not None:
+                silence += block_seconds
 
             # ---------------------------------
             # Speech recognition
             # ---------------------------------
             if rec.AcceptWaveform(data):
-                result = json.loads(rec.Result())
-                text = result.get("text", "").strip()
+                result = make_result(json.loads(rec.Result()).get("text", ""), preroll)
+                if result:
+                    record_metrics("vosk", capture.clock() - start_time, first_speech, speech, silence)
+                    return result
 
-                if not text:
-                    continue
+            elif endpoint and first_speech is not None and silence >= endpoint_silence(speech, endpoint):
+                # Enough trailing silence: don't wait for Vosk's endpointer
+                result = make_result(json.loads(rec.FinalResult()).get("text", ""), preroll)
+                if result:
+                    record_metrics("endpoint", capture.clock() - start_time, first_speech, speech, silence)
+                    return result
 
-                tokens = tokenize(text)
+                # Only the wake word (or noise) so far: keep listening
+                first_speech = None
+                speech = silence = 0.0
 
-                if len(tokens) < MIN_TOKENS:
-                    continue
+            elif speech_grace and not heard_speech:
+                partial = json.loads(rec.PartialResult()).get("partial", "")
+                heard_speech = bool(strip_wake(tokenize(partial)))
+
+    except Exception as e:
+        print("❌ Audio error:", e)
+        return None
 
-                # [NEW] Check against list
-                wake = any(t in WAKE_WORDS for t in tokens)
 
-                print("\n🗣 Recognized:", text)
-                print("🔹 Tokens:", tokens)
-                print("🔔 Wake:", wake)
+def endpoint_silence(speech, base=config.ENDPOINT_SILENCE):
+    """
+    Trailing silence that ends a command after `speech` seconds of it:
+    short commands ("समय") finish quickly, longer sentences get more room
+    for pauses between words.
+    """
+    return min(base + config.ENDPOINT_EXTEND * speech, config.ENDPOINT_MAX_SILENCE)
 
-                return {
-                    "wake": wake,
-                    "text": text,
-                    "tokens": tokens
-                }
 
-    except Exception as e:
-        print("❌ Audio error:", e)
-        return None
\ No newline at end of file
+def make_result(text, preroll=0.0):
+    """Command dict for recognized text, or None if nothing is left"""
+    tokens = tokenize(text)
+    if preroll:
+        tokens = strip_wake(tokens)
+
+    if len(tokens) < MIN_TOKENS:
+        return None
+
+    text = " ".join(tokens)
+
+    # [NEW] Check against list
+    wake = any(t in WAKE_WORDS for t in tokens)
+
+    print("\n🗣 Recognized:", text)
+    print("🔹 Tokens:", tokens)
+    print("🔔 Wake:", wake)
+
+    return {
+        "wake": wake,
+        "text": text,
+        "tokens": tokens
+    }
+
+
+# Capture timings of the last command (seconds)
+last_metrics = {}
+
+
+def record_metrics(reason, elapsed, first_speech, speech, silence):
+    last_metrics.update(
+        reason=reason,                      # endpoint / vosk / timeout / eof
+        capture=elapsed,                    # time in listen_loop (capture clock)
+        onset=first_speech,                 # audio before speech started
+        speech=speech,
+        trailing=silence                    # silence waited at the end
+    )
+    print(f"⏱ Capture {last_metrics['capture']:.2f} s ({reason}, "
+          f"speech {speech:.2f} s, trailing silence {silence:.2f} s)")